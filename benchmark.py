@@ -0,0 +1,379 @@
+import argparse
+import contextlib
+import io
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from fakes import FakeGSpreadClient, FakeSupabaseClient
+from src.pl_tracker.auth import fetch_and_preprocess_nutrition_data
+from src.pl_tracker.cleaning import clean_worksheet
+from src.pl_tracker.journal import SyncJournal
+from src.pl_tracker.sync_state import SyncState
+
+SHEET_HEADER = [
+    "Week",
+    "Day",
+    "Exercise",
+    "Sets",
+    "Min. Reps",
+    "Max. Reps",
+    "RPE Target",
+    "% Min",
+    "% Max",
+    "Carico Min (kg)",
+    "Carico Max (kg)",
+    "Topset",
+    "Test",
+    "Notes",
+]
+
+EXERCISES = ["squat", "panca", "stacco", "sumo", "rematore", "military press"]
+
+
+def make_program_sheet(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """Build raw worksheet values shaped like a program sheet with n_rows sessions."""
+    rng = np.random.default_rng(seed)
+
+    def decimal(values):
+        return [f"{value:.1f}".replace(".", ",") for value in values]
+
+    sessions = pd.DataFrame(
+        {
+            "Week": (np.arange(n_rows) // 24 + 1).astype(str),
+            "Day": (np.arange(n_rows) // 6 % 4 + 1).astype(str),
+            "Exercise": rng.choice(EXERCISES, n_rows),
+            "Sets": rng.integers(1, 6, n_rows).astype(str),
+            "Min. Reps": rng.integers(1, 6, n_rows).astype(str),
+            "Max. Reps": rng.integers(6, 11, n_rows).astype(str),
+            "RPE Target": decimal(rng.choice(np.arange(6, 10.5, 0.5), n_rows)),
+            "% Min": decimal(rng.uniform(60, 80, n_rows)),
+            "% Max": decimal(rng.uniform(80, 95, n_rows)),
+            "Carico Min (kg)": np.where(
+                rng.random(n_rows) < 0.2, "-", decimal(rng.uniform(40, 200, n_rows))
+            ),
+            "Carico Max (kg)": decimal(rng.uniform(40, 220, n_rows)),
+            "Topset": decimal(rng.uniform(40, 250, n_rows)),
+            "Test": np.where(rng.random(n_rows) < 0.05, "TRUE", ""),
+            "Notes": np.where(rng.random(n_rows) < 0.1, "felt heavy", ""),
+        }
+    )
+
+    rows = [["Program", *[""] * (len(SHEET_HEADER) - 1)], SHEET_HEADER]
+    for position, values in enumerate(sessions.itertuples(index=False)):
+        if position and position % 24 == 0:
+            rows.append([""] * len(SHEET_HEADER))
+            rows.append(SHEET_HEADER)
+        rows.append(list(values))
+
+    return pd.DataFrame(rows)
+
+
+def legacy_clean_worksheet(worksheet_df, program_id):
+    """Row-wise cleaning as implemented before the vectorized pipeline."""
+
+    def try_convert_to_float(val):
+        if isinstance(val, str):
+            val = val.replace(",", ".")
+        try:
+            return float(val)
+        except (ValueError, TypeError):
+            return val
+
+    def is_number(x):
+        try:
+            float(x)
+            return True
+        except (ValueError, TypeError):
+            return False
+
+    df_clean = worksheet_df[
+        ~worksheet_df.apply(
+            lambda row: row.astype(str).str.strip().eq("").all(), axis=1
+        )
+    ]
+    df_clean.columns = df_clean.iloc[1]
+    df_clean = df_clean[2:]
+
+    mask = df_clean.apply(lambda row: row.apply(is_number).any(), axis=1)
+    df_filtered = df_clean[mask].copy()
+    df_filtered = df_filtered.replace("-", 0.0)
+    df_filtered = df_filtered.map(try_convert_to_float)
+
+    header_row = df_filtered.columns.tolist()
+    df_filtered = df_filtered[
+        ~df_filtered.apply(lambda row: row.tolist() == header_row, axis=1)
+    ]
+    df_filtered = df_filtered.reset_index(drop=True)
+    df_filtered = df_filtered.rename(
+        columns={
+            "% Min": "perc_min",
+            "% Max": "perc_max",
+            "Carico Min (kg)": "carico_min",
+            "Carico Max (kg)": "carico_max",
+            "Min. Reps": "min_reps",
+            "Max. Reps": "max_reps",
+        }
+    )
+    df_filtered["Exercise"] = df_filtered["Exercise"].str.title()
+    df_filtered["program_id"] = program_id
+    df_filtered["Test"] = df_filtered["Test"].astype(bool)
+    return df_filtered
+
+
+def time_call(func, *args, repeat=3):
+    """Return the best wall-clock time of repeat calls and the last result."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def benchmark_clean(sizes, repeat):
+    """Compare the vectorized and row-wise worksheet cleaning on synthetic sheets."""
+    print(f"{'rows':>8} {'legacy (s)':>12} {'vectorized (s)':>15} {'speedup':>8}")
+    for n_rows in sizes:
+        sheet = make_program_sheet(n_rows)
+
+        legacy_time, expected = time_call(
+            legacy_clean_worksheet, sheet, "program", repeat=repeat
+        )
+        vectorized_time, result = time_call(
+            clean_worksheet, sheet, "program", repeat=repeat
+        )
+        pd.testing.assert_frame_equal(result, expected)
+
+        print(
+            f"{n_rows:>8} {legacy_time:>12.3f} {vectorized_time:>15.3f} "
+            f"{legacy_time / vectorized_time:>7.1f}x"
+        )
+
+
+def make_nutrition_data(athletes: int, years: int, seed: int = 0) -> pd.DataFrame:
+    """Build nutrition rows shaped like the nutrition table, one per athlete and day."""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(end="2025-06-30", periods=years * 365, freq="D")
+    n_rows = athletes * len(dates)
+
+    protein = rng.uniform(100, 220, n_rows).round(1)
+    carbs = rng.uniform(150, 450, n_rows).round(1)
+    fat = rng.uniform(40, 120, n_rows).round(1)
+    weight = rng.normal(80, 8, n_rows).round(2)
+    return pd.DataFrame(
+        {
+            "id": [f"row-{position}" for position in range(n_rows)],
+            "user_id": np.repeat([f"athlete-{i}" for i in range(athletes)], len(dates)),
+            "Date": np.tile(dates.date, athletes),
+            "Calories (kcal)": (protein * 4 + carbs * 4 + fat * 9).round(0),
+            "Protein (g)": protein,
+            "Carbs (g)": carbs,
+            "Fat (g)": fat,
+            "Target Calories (kcal)": rng.choice([0.0, 2500.0, 2800.0], n_rows),
+            "Expenditure": rng.normal(2700, 200, n_rows).round(0),
+            "Steps": rng.integers(2_000, 20_000, n_rows),
+            "Weight (kg)": weight,
+            "Trend Weight (kg)": (weight + rng.normal(0, 0.3, n_rows)).round(2),
+        }
+    )
+
+
+def legacy_preprocess_nutrition(nutrition_data):
+    """Nutrition preprocessing as implemented before the vectorized version."""
+    nutrition_data["Date"] = pd.to_datetime(nutrition_data["Date"])
+    nutrition_data = nutrition_data.sort_values(by="Date", ascending=False)
+    nutrition_data["Week"] = (
+        nutrition_data["Date"]
+        .dt.to_period("W-TUE")
+        .apply(lambda x: f"WK {x.start_time.isocalendar()[1]} - {x.start_time.year}")
+    )
+
+    nutrition_data["Protein (%)"] = (
+        nutrition_data["Protein (g)"] * 4
+    ) / nutrition_data["Calories (kcal)"]
+    nutrition_data["Carbs (%)"] = (nutrition_data["Carbs (g)"] * 4) / nutrition_data[
+        "Calories (kcal)"
+    ]
+    nutrition_data["Fat (%)"] = (nutrition_data["Fat (g)"] * 9) / nutrition_data[
+        "Calories (kcal)"
+    ]
+    nutrition_data["Total Macronutrients (%)"] = (
+        nutrition_data["Carbs (%)"]
+        + nutrition_data["Protein (%)"]
+        + nutrition_data["Fat (%)"]
+    )
+    for column in ["Protein (%)", "Carbs (%)", "Fat (%)"]:
+        nutrition_data[column] /= nutrition_data["Total Macronutrients (%)"]
+
+    return nutrition_data.round(2)
+
+
+def benchmark_nutrition(athletes, years, repeat):
+    """Compare the vectorized and legacy nutrition preprocessing in time and memory."""
+    print(
+        f"{'athletes':>8} {'rows':>9} {'legacy (s)':>11} {'new (s)':>9} "
+        f"{'speedup':>8} {'legacy (MB)':>12} {'new (MB)':>9}"
+    )
+    for n_athletes in athletes:
+        raw = make_nutrition_data(n_athletes, years)
+
+        legacy_time, expected = time_call(
+            lambda: legacy_preprocess_nutrition(raw.copy()), repeat=repeat
+        )
+        new_time, result = time_call(
+            lambda: fetch_and_preprocess_nutrition_data(raw.copy()), repeat=repeat
+        )
+
+        assert (result["Week"].astype(str) == expected["Week"]).all()
+        for column in expected.select_dtypes("number").columns:
+            np.testing.assert_array_equal(result[column], expected[column])
+
+        def megabytes(frame):
+            return frame.memory_usage(index=True, deep=True).sum() / 1024**2
+
+        print(
+            f"{n_athletes:>8} {len(raw):>9} {legacy_time:>11.3f} {new_time:>9.3f} "
+            f"{legacy_time / new_time:>7.1f}x {megabytes(expected):>12.1f} "
+            f"{megabytes(result):>9.1f}"
+        )
+
+
+def edit_program_sheet(values, fraction, seed=0):
+    """Change the Topset of a fraction of the session rows of raw worksheet values."""
+    rng = np.random.default_rng(seed)
+    topset = SHEET_HEADER.index("Topset")
+    edited = [list(row) for row in values]
+    for row in edited[2:]:
+        if row[0].isdigit() and rng.random() < fraction:
+            row[topset] = f"{rng.uniform(40, 250):.1f}".replace(".", ",")
+    return edited
+
+
+def benchmark_sync(programs, rows, sheets_latency, supabase_latency, workers, changed):
+    """
+    Time a first and an incremental sync of synthetic programs against fake backends.
+
+    Stage timings are summed across the worker threads, so with several workers they
+    can add up to more than the wall-clock time of the run.
+    """
+    import sync
+
+    spreadsheet_name = "PL Programs"
+    sheets = {
+        f"Program {index}": make_program_sheet(rows, seed=index).values.tolist()
+        for index in range(programs)
+    }
+    gspread_client = FakeGSpreadClient(
+        {spreadsheet_name: sheets}, latency_s=sheets_latency
+    )
+    supabase = FakeSupabaseClient(latency_s=supabase_latency)
+
+    stages = ["fetch", "clean", "diff", "write"]
+    print(
+        f"{'run':<12} {'total (s)':>10} "
+        + " ".join(f"{stage + ' (s)':>10}" for stage in stages)
+        + f" {'sheets req':>11} {'db req':>7} {'rows':>8}"
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        state = SyncState(Path(tmp) / "state.json")
+        journal = SyncJournal(Path(tmp) / "journal.jsonl")
+
+        for run in ["initial", "incremental"]:
+            if run == "incremental":
+                for index, (name, values) in enumerate(sheets.items()):
+                    gspread_client.set_worksheet(
+                        spreadsheet_name,
+                        name,
+                        edit_program_sheet(values, changed, seed=index),
+                    )
+
+            sheets_requests = gspread_client.requests
+            db_requests = supabase.client.requests
+            with contextlib.redirect_stdout(io.StringIO()):
+                report = sync.run_athlete(
+                    sync.DEFAULT_USER_ID,
+                    spreadsheet_name,
+                    gspread_client,
+                    supabase,
+                    state,
+                    journal,
+                    workers,
+                )
+            if report.error:
+                raise RuntimeError(report.error)
+
+            print(
+                f"{run:<12} {report.elapsed_s:>10.3f} "
+                + " ".join(
+                    f"{report.timings.get(stage, 0.0):>10.3f}" for stage in stages
+                )
+                + f" {gspread_client.requests - sheets_requests:>11}"
+                f" {supabase.client.requests - db_requests:>7}"
+                f" {sum(result.rows for result in report.results):>8}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="PL Tracker benchmarks")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    clean_parser = subparsers.add_parser("clean", help="Worksheet cleaning")
+    clean_parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000]
+    )
+    clean_parser.add_argument("--repeat", type=int, default=3)
+
+    nutrition_parser = subparsers.add_parser(
+        "nutrition", help="Nutrition preprocessing time and memory"
+    )
+    nutrition_parser.add_argument(
+        "--athletes", type=int, nargs="+", default=[1, 10, 50]
+    )
+    nutrition_parser.add_argument("--years", type=int, default=3)
+    nutrition_parser.add_argument("--repeat", type=int, default=3)
+
+    sync_parser = subparsers.add_parser(
+        "sync", help="End-to-end sync against in-process fake backends"
+    )
+    sync_parser.add_argument("--programs", type=int, default=20)
+    sync_parser.add_argument("--rows", type=int, default=500)
+    sync_parser.add_argument(
+        "--sheets-latency-ms",
+        type=float,
+        default=100.0,
+        help="Latency added to every Google Sheets request.",
+    )
+    sync_parser.add_argument(
+        "--supabase-latency-ms",
+        type=float,
+        default=30.0,
+        help="Latency added to every Supabase request.",
+    )
+    sync_parser.add_argument("--workers", type=int, default=4)
+    sync_parser.add_argument(
+        "--changed",
+        type=float,
+        default=0.05,
+        help="Fraction of session rows edited before the incremental run.",
+    )
+
+    args = parser.parse_args()
+
+    if args.benchmark == "clean":
+        benchmark_clean(args.sizes, args.repeat)
+    elif args.benchmark == "nutrition":
+        benchmark_nutrition(args.athletes, args.years, args.repeat)
+    elif args.benchmark == "sync":
+        benchmark_sync(
+            args.programs,
+            args.rows,
+            args.sheets_latency_ms / 1000,
+            args.supabase_latency_ms / 1000,
+            args.workers,
+            args.changed,
+        )
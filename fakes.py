@@ -0,0 +1,269 @@
+"""
+In-process stand-ins for Google Sheets and Supabase, for profiling sync offline.
+
+FakeGSpreadClient runs the real GSpreadClient methods against in-memory
+spreadsheets; FakeSupabaseClient is a SupabaseClient whose `client` answers the
+supabase-py table builder calls used by sync.py and database.py from in-memory
+tables. Both sleep for a configurable latency on every request they serve.
+"""
+
+import copy
+import threading
+import time
+
+import gspread
+
+from src.pl_tracker.database import SupabaseClient
+from src.pl_tracker.gspread import GSpreadClient
+
+
+class FakeWorksheet:
+    def __init__(self, spreadsheet, title):
+        self.spreadsheet = spreadsheet
+        self.title = title
+
+    def get_all_values(self):
+        self.spreadsheet.wait()
+        return copy.deepcopy(self.spreadsheet.values[self.title])
+
+
+class FakeSpreadsheet:
+    def __init__(self, title, values, latency_s=0.0):
+        self.title = title
+        self.values = values
+        self.latency_s = latency_s
+        self.version = 1
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        with self.lock:
+            self.requests += 1
+        time.sleep(self.latency_s)
+
+    def worksheets(self):
+        self.wait()
+        return [FakeWorksheet(self, title) for title in self.values]
+
+    def worksheet(self, title):
+        self.wait()
+        if title not in self.values:
+            raise gspread.exceptions.WorksheetNotFound(title)
+        return FakeWorksheet(self, title)
+
+    def values_batch_get(self, ranges, params=None):
+        self.wait()
+        value_ranges = []
+        for range_name in ranges:
+            title = range_name[1:-1].replace("''", "'")
+            value_ranges.append(
+                {"range": range_name, "values": copy.deepcopy(self.values[title])}
+            )
+        return {"valueRanges": value_ranges}
+
+    def get_lastUpdateTime(self):
+        self.wait()
+        return f"version-{self.version}"
+
+
+class FakeGspread:
+    def __init__(self, spreadsheets):
+        self.spreadsheets = spreadsheets
+
+    def open(self, title):
+        if title not in self.spreadsheets:
+            raise gspread.exceptions.SpreadsheetNotFound(title)
+        return self.spreadsheets[title]
+
+
+class FakeGSpreadClient(GSpreadClient):
+    """GSpreadClient reading from in-memory spreadsheets instead of the Sheets API."""
+
+    def __init__(self, spreadsheets=None, latency_s=0.0, rate_limiter=None):
+        self.scopes = []
+        self.rate_limiter = rate_limiter
+        self.creds = None
+        self.service = None
+        self.latency_s = latency_s
+        self.fake_spreadsheets = {}
+        self.gspread_client = FakeGspread(self.fake_spreadsheets)
+        self.spreadsheets = {}
+        for spreadsheet_name, worksheets in (spreadsheets or {}).items():
+            for worksheet_name, values in worksheets.items():
+                self.set_worksheet(spreadsheet_name, worksheet_name, values)
+
+    def set_worksheet(self, spreadsheet_name, worksheet_name, values):
+        """Create or overwrite a worksheet, bumping the spreadsheet's modified time."""
+        if spreadsheet_name not in self.fake_spreadsheets:
+            self.fake_spreadsheets[spreadsheet_name] = FakeSpreadsheet(
+                spreadsheet_name, {}, self.latency_s
+            )
+        spreadsheet = self.fake_spreadsheets[spreadsheet_name]
+        spreadsheet.values[worksheet_name] = [list(row) for row in values]
+        spreadsheet.version += 1
+
+    @property
+    def requests(self):
+        """Number of requests served across every spreadsheet."""
+        return sum(
+            spreadsheet.requests for spreadsheet in self.fake_spreadsheets.values()
+        )
+
+
+class FakeResponse:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+class FakeQuery:
+    """Table builder supporting the subset of the PostgREST API the app uses."""
+
+    def __init__(self, backend, table):
+        self.backend = backend
+        self.table = table
+        self.operation = "select"
+        self.columns = "*"
+        self.count = None
+        self.payload = None
+        self.on_conflict = "id"
+        self.filters = []
+        self.order_by = []
+        self.row_range = None
+
+    def select(self, *columns, count=None):
+        self.operation = "select"
+        self.columns = ",".join(columns) or "*"
+        self.count = count
+        return self
+
+    def insert(self, json):
+        self.operation = "insert"
+        self.payload = json
+        return self
+
+    def upsert(self, json, on_conflict="id", **kwargs):
+        self.operation = "upsert"
+        self.payload = json
+        self.on_conflict = on_conflict or "id"
+        return self
+
+    def update(self, json):
+        self.operation = "update"
+        self.payload = json
+        return self
+
+    def delete(self):
+        self.operation = "delete"
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def in_(self, column, values):
+        values = set(values)
+        self.filters.append(lambda row: row.get(column) in values)
+        return self
+
+    def match(self, query):
+        for column, value in query.items():
+            self.eq(column, value)
+        return self
+
+    def order(self, column, desc=False):
+        self.order_by.append((column, desc))
+        return self
+
+    def range(self, start, end):
+        self.row_range = (start, end)
+        return self
+
+    def execute(self):
+        time.sleep(self.backend.latency_s)
+        with self.backend.lock:
+            self.backend.requests += 1
+            rows = self.backend.tables.setdefault(self.table, [])
+            return getattr(self, f"_{self.operation}")(rows)
+
+    def _matching(self, rows):
+        return [row for row in rows if all(check(row) for check in self.filters)]
+
+    def _select(self, rows):
+        selected = self._matching(rows)
+        for column, desc in reversed(self.order_by):
+            selected = sorted(
+                selected, key=lambda row: (row.get(column) is None, row.get(column))
+            )
+            if desc:
+                selected.reverse()
+
+        count = len(selected) if self.count else None
+        if self.row_range is not None:
+            start, end = self.row_range
+            selected = selected[start : end + 1]
+
+        if self.columns != "*":
+            columns = [column.strip() for column in self.columns.split(",")]
+            selected = [
+                {column: row.get(column) for column in columns} for row in selected
+            ]
+
+        return FakeResponse(copy.deepcopy(selected), count)
+
+    def _records(self):
+        records = self.payload if isinstance(self.payload, list) else [self.payload]
+        return copy.deepcopy(records)
+
+    def _insert(self, rows):
+        records = self._records()
+        rows.extend(records)
+        return FakeResponse(copy.deepcopy(records))
+
+    def _upsert(self, rows):
+        records = self._records()
+        keys = [column.strip() for column in self.on_conflict.split(",")]
+        index = {tuple(row.get(key) for key in keys): row for row in rows}
+        for record in records:
+            existing = index.get(tuple(record.get(key) for key in keys))
+            if existing is None:
+                rows.append(record)
+                index[tuple(record.get(key) for key in keys)] = record
+            else:
+                existing.update(record)
+        return FakeResponse(copy.deepcopy(records))
+
+    def _update(self, rows):
+        updated = self._matching(rows)
+        for row in updated:
+            row.update(copy.deepcopy(self.payload))
+        return FakeResponse(copy.deepcopy(updated))
+
+    def _delete(self, rows):
+        deleted = self._matching(rows)
+        rows[:] = [row for row in rows if not any(row is d for d in deleted)]
+        return FakeResponse(copy.deepcopy(deleted))
+
+
+class FakePostgrest:
+    """Stand-in for the supabase-py Client, holding tables as lists of dicts."""
+
+    def __init__(self, tables=None, latency_s=0.0):
+        self.tables = tables if tables is not None else {}
+        self.latency_s = latency_s
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    def table(self, table_name):
+        return FakeQuery(self, table_name)
+
+    def from_(self, table_name):
+        return self.table(table_name)
+
+
+class FakeSupabaseClient(SupabaseClient):
+    """SupabaseClient backed by in-memory tables instead of a Supabase project."""
+
+    def __init__(self, tables=None, latency_s=0.0, rate_limiter=None):
+        self.client = FakePostgrest(tables, latency_s)
+        self.rate_limiter = rate_limiter
@@ -1,4 +1,5 @@
 import streamlit as st
+import pandas as pd
 import plotly.express as px
 
 from auth0.authentication import GetToken
@@ -6,6 +7,10 @@ from auth0.management import Auth0
 from collections import Counter
 from datetime import datetime
 
+from src.pl_tracker.auth import get_client_pool
+from src.pl_tracker.data_cache import get_data_cache
+from src.pl_tracker.figure_cache import get_figure_cache
+
 st.title("Admin Page")
 
 
@@ -60,3 +65,47 @@ fig_connection_type = px.pie(
     color_discrete_sequence=["#174C4F", "#F0EB4E"],
 )
 st.plotly_chart(fig_connection_type)
+
+st.subheader("Supabase connections")
+connection_stats = get_client_pool().stats.snapshot()
+clients_col, opened_col, reused_col = st.columns(3)
+clients_col.metric(
+    "Clients opened",
+    connection_stats["clients_opened"],
+    help=f"Reused {connection_stats['clients_reused']} times",
+)
+opened_col.metric("Connections opened", connection_stats["connections_opened"])
+reused_col.metric(
+    "Requests on a reused connection", connection_stats["connections_reused"]
+)
+
+st.subheader("Shared data cache")
+cache_stats = get_data_cache().stats()
+entries_col, size_col, hits_col, evictions_col = st.columns(4)
+entries_col.metric("Entries", cache_stats["entries"])
+size_col.metric("Size (MB)", round(cache_stats["nbytes"] / 1024**2, 1))
+hits_col.metric("Hits", cache_stats["hits"], help=f"{cache_stats['misses']} misses")
+evictions_col.metric("Evictions", cache_stats["evictions"])
+
+st.subheader("Figure cache")
+figure_stats = get_figure_cache().stats()
+entries_col, hits_col, evictions_col = st.columns(3)
+entries_col.metric("Entries", figure_stats["entries"])
+hits_col.metric("Hits", figure_stats["hits"], help=f"{figure_stats['misses']} misses")
+evictions_col.metric("Evictions", figure_stats["evictions"])
+
+st.subheader("Login load timings")
+load_timings = st.session_state.get("load_timings")
+if load_timings:
+    st.caption(
+        "Queries of this session's login, in seconds from the start of the load. "
+        "The query ending last is the critical path."
+    )
+    st.dataframe(
+        pd.DataFrame.from_dict(load_timings, orient="index")
+        .rename(columns={"start_s": "Start", "end_s": "End", "elapsed_s": "Elapsed"})
+        .sort_values("Start")
+        .round(3)
+    )
+else:
+    st.caption("No login load was recorded in this session.")
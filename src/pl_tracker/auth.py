@@ -1,35 +1,131 @@
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 import streamlit as st
+import numpy as np
 import pandas as pd
-from src.pl_tracker.database import SupabaseClient
+from src.pl_tracker.calculations import (
+    add_e1rm_columns,
+    compact_sessions,
+    compute_week_labels,
+)
+from src.pl_tracker.data_cache import fetch_cached, get_data_cache
+from src.pl_tracker.database import SupabaseClientPool
+from src.pl_tracker.rpe import get_rpe_chart
+
+
+class QueryTimer:
+    """Run queries and record when each started and finished, relative to creation."""
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.timings = {}
+
+    def run(self, name, func, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            end = time.perf_counter()
+            self.timings[name] = {
+                "start_s": start - self.origin,
+                "end_s": end - self.origin,
+                "elapsed_s": end - start,
+            }
 
 
 def login():
     st.login("auth0")
 
 
+@st.cache_resource
+def get_client_pool():
+    return SupabaseClientPool()
+
+
+@st.cache_resource
+def get_prefetch_executor():
+    return ThreadPoolExecutor(max_workers=2, thread_name_prefix="prefetch")
+
+
+PREFETCH_BATCH_SIZE = 10
+
+
 def cache_user_data():
-    st.session_state["supabase_client"] = SupabaseClient(
+    st.session_state["supabase_client"] = get_client_pool().get(
         os.environ.get("SUPABASE_URL", st.secrets["supabase"]["supabase_url"]),
         os.environ.get("SUPABASE_API_KEY", st.secrets["supabase"]["api_key"]),
     )
 
     if st.user["is_logged_in"]:
-        user_id = fetch_user(st.user["email"])
-
-        if "user_sessions" not in st.session_state:
-            user_sessions, nutrition_data, videos_data = fetch_user_data(user_id)
-            rpe_table = fetch_rpe_table()
-            st.session_state["user_sessions"] = pd.merge(
-                user_sessions,
-                rpe_table,
-                left_on=["RPE Target", "max_reps"],
-                right_on=["rpe", "reps"],
-                how="left",
+        if "user_sessions" in st.session_state:
+            fetch_user(st.user["email"])
+            return
+
+        supabase = st.session_state["supabase_client"]
+        cache = get_data_cache()
+        timer = QueryTimer()
+
+        # Only the first login of the process reads the RPE chart. It depends on
+        # nothing, so it is read on a worker thread while the user and their data
+        # are loaded, and waited for before the e1RM columns need it.
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            chart_future = executor.submit(
+                timer.run, "rpe_chart", get_rpe_chart, supabase
+            )
+            user_id = timer.run("users", fetch_user, st.user["email"])
+            if user_id is False:
+                return
+
+            # Admins start on the first athlete of the selector in common_nav; the
+            # others are loaded when selected.
+            selected_user_id = st.session_state.setdefault(
+                "selected_user_id", user_id[0]
             )
+            user_sessions, nutrition_data, videos_data = fetch_user_data(
+                [selected_user_id], supabase, timer, cache
+            )
+            chart_future.result()
+
+        st.session_state["load_timings"] = timer.timings
+
+        store_athlete_data(selected_user_id, user_sessions, nutrition_data, videos_data)
+        prefetch_athletes(
+            [other for other in user_id if other != selected_user_id], supabase, cache
+        )
+
+
+def store_athlete_data(user_id, user_sessions, nutrition_data, videos_data):
+    """Make an athlete's data the one the pages of this session show."""
+    st.session_state["user_sessions"] = add_e1rm_columns(user_sessions)
+    st.session_state["nutrition_data"] = nutrition_data
+    st.session_state["videos_data"] = videos_data
+    st.session_state["loaded_user_id"] = user_id
 
-            st.session_state["nutrition_data"] = nutrition_data
-            st.session_state["videos_data"] = videos_data
+
+def load_athlete(user_id):
+    """Load an athlete's data into the session if another athlete is loaded."""
+    if st.session_state.get("loaded_user_id") == user_id:
+        return
+
+    user_sessions, nutrition_data, videos_data = fetch_user_data(
+        [user_id], st.session_state["supabase_client"], cache=get_data_cache()
+    )
+    store_athlete_data(user_id, user_sessions, nutrition_data, videos_data)
+
+
+def prefetch_athletes(user_ids, supabase, cache):
+    """Warm the shared data cache with the given athletes in the background."""
+
+    def prefetch(batch):
+        try:
+            fetch_user_data(batch, supabase, cache=cache)
+        except Exception as e:
+            print(f"Prefetching {len(batch)} athletes failed: {e}")
+
+    executor = get_prefetch_executor()
+    for start in range(0, len(user_ids), PREFETCH_BATCH_SIZE):
+        executor.submit(prefetch, user_ids[start : start + PREFETCH_BATCH_SIZE])
 
 
 def fetch_user(email):
@@ -60,78 +156,113 @@ def fetch_user(email):
     else:
         st.session_state["is_admin"] = False
         user_id = user_info["id"].tolist()
+        st.session_state["selected_user_id"] = user_id[0]
 
     return user_id
 
 
-def fetch_user_data(user_id):
-    """Fetch user data from the database."""
-
-    user_programs = (
-        st.session_state["supabase_client"]
-        .client.table("programs")
-        .select("*")
-        .in_("user_id", user_id)
-        .execute()
-    ).data
+def fetch_user_data(user_id, supabase=None, timer=None, cache=None):
+    """
+    Fetch the sessions, nutrition and videos of the given users.
+
+    Each table is served per user from the shared data cache; only users missing
+    from it are queried. Programs, nutrition and videos are requested concurrently;
+    only sessions wait, for the program ids. The queries never touch
+    st.session_state, so they can run off the script thread.
+
+    Args:
+        user_id (list): Ids of the users to fetch data for.
+        supabase (SupabaseClient): Client to query, the session's one by default.
+        timer (QueryTimer): Records the timing of every query, a new one by default.
+        cache (DataCache): Cache shared across sessions, the process one by default.
+
+    Returns:
+        tuple: Sessions, preprocessed nutrition data and videos DataFrames.
+    """
+    if supabase is None:
+        supabase = st.session_state["supabase_client"]
+    if timer is None:
+        timer = QueryTimer()
+    if cache is None:
+        cache = get_data_cache()
+
+    def fetch_sessions(user_ids):
+        user_programs = timer.run(
+            "programs",
+            lambda: supabase.client.table("programs")
+            .select("*")
+            .in_("user_id", user_ids)
+            .execute()
+            .data,
+        )
 
-    user_programs_dict = {program["id"]: program["name"] for program in user_programs}
+        user_programs_dict = {
+            program["id"]: program["name"] for program in user_programs
+        }
 
-    user_sessions = pd.DataFrame(
-        st.session_state["supabase_client"]
-        .client.table("sessions")
-        .select("*")
-        .in_("program_id", list(user_programs_dict.keys()))
-        .execute()
-        .data
-    )
+        user_sessions, _ = timer.run(
+            "sessions",
+            supabase.fetch_paged,
+            "sessions",
+            {"program_id": list(user_programs_dict.keys())},
+        )
+        if user_sessions.empty:
+            return pd.DataFrame(columns=["user_id", "name", "date", "program_week"])
 
-    user_sessions = (
-        pd.merge(
+        user_sessions = pd.merge(
             user_sessions,
-            pd.DataFrame(user_programs)[["id", "name", "date", "user_id"]],
+            pd.DataFrame(user_programs, columns=["id", "name", "date", "user_id"]),
             left_on="program_id",
             right_on="id",
             suffixes=("", "_program"),
-        )
-        .drop(columns=["id_program"])
-        .sort_values("date", ascending=True)
-    )
+        ).drop(columns=["id_program"])
 
-    nutrition_data = fetch_and_preprocess_nutrition_data(user_id=user_id)
+        return compact_sessions(user_sessions)
 
-    user_sessions["program_week"] = (
-        user_sessions["name"] + " - Week " + user_sessions["Week"].astype(str)
-    )
+    def fetch_nutrition(user_ids):
+        nutrition_data = timer.run("nutrition", supabase.fetch_nutrition_data, user_ids)
+        if nutrition_data.empty:
+            return pd.DataFrame(columns=["user_id", "Date"])
+        return fetch_and_preprocess_nutrition_data(nutrition_data)
 
-    videos_data = pd.DataFrame(
-        st.session_state["supabase_client"]
-        .client.table("videos")
-        .select("*")
-        .in_("user_id", user_id)
-        .execute()
-        .data
-    )
+    def fetch_videos(user_ids):
+        videos_data, _ = timer.run(
+            "videos", supabase.fetch_paged, "videos", {"user_id": user_ids}
+        )
+        return videos_data
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        sessions_future, nutrition_future, videos_future = [
+            executor.submit(fetch_cached, cache, table, user_id, fetch)
+            for table, fetch in [
+                ("sessions", fetch_sessions),
+                ("nutrition", fetch_nutrition),
+                ("videos", fetch_videos),
+            ]
+        ]
+
+        user_sessions = compact_sessions(sessions_future.result()).sort_values(
+            "date", ascending=True
+        )
+        nutrition_data = nutrition_future.result().sort_values(
+            by="Date", ascending=False
+        )
+        videos_data = videos_future.result()
 
     return user_sessions, nutrition_data, videos_data
 
 
-def fetch_rpe_table():
-    """Fetch RPE table from the database."""
-    rpe_table = pd.DataFrame(
-        st.session_state["supabase_client"]
-        .client.table("rpe_chart")
-        .select("*")
-        .execute()
-        .data
-    )
-    return rpe_table
-
-
 def fetch_and_preprocess_nutrition_data(
     nutrition_data: pd.DataFrame = None, user_id: str = None
 ):
-    """Preprocess nutrition data for analysis."""
+    """
+    Preprocess nutrition data for analysis.
+
+    Week labels are stored as a categorical, float columns are rounded to two
+    decimals, integer columns are downcast to the smallest integer type and the
+    macro percentages are derived with in-place array operations. Floats stay
+    float64, as every float column may be displayed.
+    """
     if nutrition_data is None:
         nutrition_data = st.session_state["supabase_client"].fetch_nutrition_data(
             user_id
@@ -139,32 +270,36 @@ def fetch_and_preprocess_nutrition_data(
 
     nutrition_data["Date"] = pd.to_datetime(nutrition_data["Date"])
     nutrition_data = nutrition_data.sort_values(by="Date", ascending=False)
-    nutrition_data["Week"] = (
-        nutrition_data["Date"]
-        .dt.to_period("W-TUE")
-        .apply(lambda x: f"WK {x.start_time.isocalendar()[1]} - {x.start_time.year}")
-    )
-
-    nutrition_data["Protein (%)"] = (
-        nutrition_data["Protein (g)"] * 4
-    ) / nutrition_data["Calories (kcal)"]
-
-    nutrition_data["Carbs (%)"] = (nutrition_data["Carbs (g)"] * 4) / nutrition_data[
-        "Calories (kcal)"
-    ]
-    nutrition_data["Fat (%)"] = (nutrition_data["Fat (g)"] * 9) / nutrition_data[
-        "Calories (kcal)"
-    ]
-
-    nutrition_data["Total Macronutrients (%)"] = (
-        nutrition_data["Carbs (%)"]
-        + nutrition_data["Protein (%)"]
-        + nutrition_data["Fat (%)"]
+    nutrition_data["Week"] = compute_week_labels(nutrition_data["Date"])
+
+    calories = nutrition_data["Calories (kcal)"].to_numpy(dtype=float)
+    percentages = {}
+    for column, grams, kcal_per_gram in [
+        ("Protein (%)", "Protein (g)", 4),
+        ("Carbs (%)", "Carbs (g)", 4),
+        ("Fat (%)", "Fat (g)", 9),
+    ]:
+        percentage = nutrition_data[grams].to_numpy(dtype=float) * kcal_per_gram
+        np.divide(percentage, calories, out=percentage)
+        percentages[column] = percentage
+
+    total = percentages["Carbs (%)"] + percentages["Protein (%)"]
+    total += percentages["Fat (%)"]
+    for percentage in percentages.values():
+        np.divide(percentage, total, out=percentage)
+
+    nutrition_data = nutrition_data.assign(
+        **percentages, **{"Total Macronutrients (%)": total}
     )
 
-    for column in ["Protein (%)", "Carbs (%)", "Fat (%)"]:
-        nutrition_data[column] /= nutrition_data["Total Macronutrients (%)"]
+    for column in nutrition_data.select_dtypes("number").columns:
+        values = nutrition_data[column]
+        if pd.api.types.is_float_dtype(values):
+            nutrition_data[column] = values.round(2)
+        else:
+            nutrition_data[column] = pd.to_numeric(values, downcast="integer")
 
-    nutrition_data = nutrition_data.round(2)
+    if "user_id" in nutrition_data:
+        nutrition_data["user_id"] = nutrition_data["user_id"].astype("category")
 
     return nutrition_data
@@ -1,24 +1,159 @@
+import numpy as np
 import pandas as pd
+from src.pl_tracker.fingerprint import data_version, fingerprint_frame
+from src.pl_tracker.memo import LRUCache
+from src.pl_tracker.nutrition_store import get_nutrition_store
+from src.pl_tracker.rolling_stats import RollingNutritionStats, get_rolling_stats
+from src.pl_tracker.rpe import default_rpe_chart, rpe_percentage
 
+E1RM_FORMULAS = ["rpe", "epley", "brzycki", "lombardi"]
 
-def compute_1rm_tests(user_sessions: pd.DataFrame, groupby: str) -> pd.DataFrame:
+E1RM_CACHE_SIZE = 64
+
+e1rm_cache = LRUCache(E1RM_CACHE_SIZE)
+
+
+def compute_e1rm(user_sessions: pd.DataFrame, chart=None) -> pd.DataFrame:
+    """
+    Estimate the 1RM of every set's topset with each formula, in one vectorized pass.
+
+    - rpe: Topset divided by the RPE chart percentage of (RPE Target, max_reps).
+    - epley: Topset * (1 + reps / 30), the topset itself for singles.
+    - brzycki: Topset * 36 / (37 - reps), NaN from 37 reps.
+    - lombardi: Topset * reps ** 0.1.
+
+    Results are cached by the fingerprints of the chart and of the columns they
+    depend on, so frames holding the same sets, in any session, are only computed
+    once per chart.
+
+    Args:
+        user_sessions (pd.DataFrame): Sessions with 'Topset', 'max_reps' and 'RPE Target'.
+        chart (RPEChart): Chart for the rpe formula, the process-wide one by default.
+
+    Returns:
+        pd.DataFrame: One 'e1rm_<formula>' column per formula, on the sessions' index.
+    """
+    if chart is None:
+        chart = default_rpe_chart()
+    inputs = user_sessions[["Topset", "max_reps", "RPE Target"]]
+    version = (chart.fingerprint, fingerprint_frame(inputs))
+
+    columns = e1rm_cache.get(version)
+    if columns is None:
+        weight = pd.to_numeric(inputs["Topset"], errors="coerce").to_numpy(float)
+        reps = pd.to_numeric(inputs["max_reps"], errors="coerce").to_numpy(float)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            columns = {
+                "e1rm_rpe": weight / rpe_percentage(inputs["RPE Target"], reps, chart),
+                "e1rm_epley": np.where(reps == 1, weight, weight * (1 + reps / 30)),
+                "e1rm_brzycki": np.where(reps < 37, weight * 36 / (37 - reps), np.nan),
+                "e1rm_lombardi": weight * reps**0.1,
+            }
+
+        e1rm_cache.put(version, columns)
+
+    return pd.DataFrame(columns, index=user_sessions.index)
+
+
+def add_e1rm_columns(user_sessions: pd.DataFrame, chart=None) -> pd.DataFrame:
+    """Return the sessions with the e1RM columns of compute_e1rm added."""
+    if user_sessions.empty:
+        return user_sessions
+    return user_sessions.assign(**compute_e1rm(user_sessions, chart))
+
+
+def compute_1rm_tests(
+    user_sessions: pd.DataFrame, groupby: str, formula: str = "rpe"
+) -> pd.DataFrame:
     """
     Compute the 1RM progress for each user and exercise.
 
+    Reads the precomputed e1RM column of the formula when the sessions have one.
+
     Args:
-        sessions (pd.DataFrame): DataFrame containing session data with columns 'name', 'Exercise', 'Topset'.
+        sessions (pd.DataFrame): DataFrame containing session data with columns 'name', 'Exercise', 'Topset', 'RPE Target', 'max_reps'.
+        groupby (str): "name" to keep only test sets, anything else to keep every set.
+        formula (str): One of E1RM_FORMULAS.
 
     Returns:
         pd.DataFrame: DataFrame with columns 'name', 'Exercise', '1rm_th' representing the 1RM progress.
     """
     if groupby == "name":
-        tests_df = user_sessions.query("Test == True")
+        tests_df = user_sessions[user_sessions["Test"] == True]
     else:
-        tests_df = user_sessions.copy()
+        tests_df = user_sessions
+
+    column = f"e1rm_{formula}"
+    e1rm = tests_df[column] if column in tests_df else compute_e1rm(tests_df)[column]
+
+    return tests_df.assign(**{"1rm_th": e1rm.round(2)})
+
+
+PROGRESSION_EXERCISES = ["Squat", "Panca", "Stacco", "Sumo"]
+
+
+def compute_1rm_progression(
+    user_sessions: pd.DataFrame,
+    time_definition: str = "Program",
+    program: str = None,
+    formula: str = "rpe",
+) -> pd.DataFrame:
+    """
+    Compute the 1RM progression of the main lifts and their total, in one aggregation.
+
+    Sets are grouped once by (period, date, Exercise), collecting the mean and sum of
+    their e1RM. Each exercise's value is the mean; the total of a (period, date) is
+    then summed from those few rows: the sum over every test set per program, or the
+    sum of the exercise means per week. Sets with an e1RM of 0 are left out.
 
-    tests_df["1rm_th"] = round(tests_df["Topset"] / tests_df["percentage"], 2)
+    Args:
+        user_sessions (pd.DataFrame): DataFrame containing session data with columns 'name', 'date', 'program_week', 'Exercise', 'Test' and the e1RM inputs.
+        time_definition (str): "Program" for test sets per program, "Weekly" for every set per program week.
+        program (str): Only keep the sessions of this program.
+        formula (str): One of E1RM_FORMULAS.
+
+    Returns:
+        pd.DataFrame: Columns 'period', 'date', 'Exercise', '1rm_th', sorted by date and
+        period, with the total in rows whose 'Exercise' is "Total".
+    """
+    period = "name" if time_definition == "Program" else "program_week"
 
-    return tests_df
+    if program:
+        user_sessions = user_sessions[user_sessions["name"] == program]
+    sets = compute_1rm_tests(
+        user_sessions[user_sessions["Exercise"].isin(PROGRESSION_EXERCISES)],
+        period,
+        formula,
+    )
+    sets = sets[sets["1rm_th"] != 0]
+
+    per_exercise = (
+        sets.groupby([period, "date", "Exercise"], observed=True)["1rm_th"]
+        .agg(["mean", "sum"])
+        .reset_index()
+    )
+    totals = (
+        per_exercise.groupby([period, "date"], observed=True, sort=False)[
+            "sum" if period == "name" else "mean"
+        ]
+        .sum()
+        .round()
+        .reset_index(name="1rm_th")
+        .assign(Exercise="Total")
+    )
+
+    progression = pd.concat(
+        [per_exercise.drop(columns="sum").rename(columns={"mean": "1rm_th"}), totals],
+        ignore_index=True,
+    )
+    return (
+        progression.rename(columns={period: "period"})[
+            ["period", "date", "Exercise", "1rm_th"]
+        ]
+        .sort_values(["date", "period"], kind="stable")
+        .reset_index(drop=True)
+    )
 
 
 def compute_sets_per_week(
@@ -49,16 +184,124 @@ def compute_sets_per_week(
         sorted_sessions = user_sessions.sort_values(by=["date", "name", "Week", "Day"])
 
     sets_per_week = sorted_sessions.groupby(
-        ["date", "program_week", "Exercise"], as_index=False
+        ["date", "program_week", "Exercise"], as_index=False, observed=True
     ).agg(total_sets=("Sets", "sum"))
 
     return sets_per_week
 
 
+SESSION_CATEGORIES = ["name", "Exercise", "user_id", "program_id", "Notes"]
+
+
+def compact_sessions(user_sessions: pd.DataFrame) -> pd.DataFrame:
+    """
+    Store a sessions frame in categoricals and small numeric dtypes.
+
+    Whole-number columns become the smallest integer type. Other float columns keep
+    float64, as they are displayed and feed the e1RM estimates. program_week becomes a categorical ordered by program date, program
+    name and week number, so "Week 2" comes before "Week 10". The input is not
+    modified, and compacting a compacted frame (e.g. after a concat turned its
+    categoricals back into objects) gives the same frame.
+
+    Args:
+        user_sessions (pd.DataFrame): Sessions joined with their program's name and date.
+
+    Returns:
+        pd.DataFrame: The same rows and columns with compact dtypes.
+    """
+    if user_sessions.empty:
+        return user_sessions
+
+    sessions = user_sessions.copy(deep=False)
+    if "program_week" not in sessions:
+        sessions["program_week"] = (
+            sessions["name"].astype(str) + " - Week " + sessions["Week"].astype(str)
+        )
+
+    for column in sessions.select_dtypes("number").columns:
+        values = sessions[column]
+        if pd.api.types.is_integer_dtype(values):
+            sessions[column] = pd.to_numeric(values, downcast="integer")
+        elif values.notna().all() and (values == values.round()).all():
+            sessions[column] = pd.to_numeric(values.astype("int64"), downcast="integer")
+
+    program_weeks = (
+        sessions[["date", "name", "Week", "program_week"]]
+        .astype({"name": str, "program_week": str})
+        .drop_duplicates()
+        .sort_values(["date", "name", "Week"])
+    )
+    sessions["program_week"] = pd.Categorical(
+        sessions["program_week"].astype(str),
+        categories=program_weeks["program_week"].unique(),
+        ordered=True,
+    )
+
+    for column in SESSION_CATEGORIES:
+        if column in sessions:
+            sessions[column] = sessions[column].astype("category")
+
+    return sessions
+
+
+def compute_week_labels(dates: pd.Series) -> pd.Categorical:
+    """
+    Label each date with the week, ending on Tuesday, it belongs to.
+
+    Labels read "WK <ISO week> - <year>" of the Wednesday starting the week. They
+    are built once per distinct week and returned as a categorical ordered by week.
+
+    Args:
+        dates (pd.Series): Datetime values.
+
+    Returns:
+        pd.Categorical: One label per date, missing for missing dates.
+    """
+    days_since_start = (dates.dt.dayofweek - 2) % 7
+    week_start = dates.dt.normalize() - pd.to_timedelta(days_since_start, unit="D")
+
+    codes, starts = pd.factorize(week_start, sort=True)
+    labels = (
+        "WK "
+        + starts.isocalendar()["week"].astype(str).to_numpy()
+        + " - "
+        + starts.year.astype(str).to_numpy()
+    )
+
+    # Around new year two week starts can share a label, e.g. "WK 1 - 2025" for both
+    # 2025-01-01 and 2025-12-31.
+    label_codes, categories = pd.factorize(labels)
+    codes = np.where(codes >= 0, label_codes[codes], -1)
+    return pd.Categorical.from_codes(codes, categories=categories, ordered=True)
+
+
+def get_rolling_nutrition_stats(
+    nutrition_data: pd.DataFrame, user_id: str
+) -> RollingNutritionStats:
+    """
+    Get the rolling nutrition metrics of a user, kept up to date across uploads.
+
+    Args:
+        nutrition_data (pd.DataFrame): DataFrame containing nutrition data with columns 'user_id', 'Date', etc.
+        user_id (str): The user ID to filter by.
+
+    Returns:
+        RollingNutritionStats: The user's 7 and 28 day averages, trend weight and weekly rate.
+    """
+    return get_rolling_stats().get(
+        user_id,
+        data_version(nutrition_data),
+        lambda: get_nutrition_store(nutrition_data).user(user_id),
+    )
+
+
 def get_last_weight_entry(nutrition_data: pd.DataFrame, user_id: str) -> pd.DataFrame:
     """
     Get the last weight entry for a user.
 
+    Uses the uploaded trend weight of the last entry, or the rolling trend weight
+    when the upload has none.
+
     Args:
         nutrition_data (pd.DataFrame): DataFrame containing nutrition data with columns 'user_id', 'Date', 'Weight (kg)'.
         user_id (str): The user ID to filter by.
@@ -66,15 +309,33 @@ def get_last_weight_entry(nutrition_data: pd.DataFrame, user_id: str) -> pd.Data
     Returns:
         pd.DataFrame: DataFrame with the last weight entry for the specified user.
     """
-    nutrition_data["Date"] = pd.to_datetime(nutrition_data["Date"])
-    user_nutrition = nutrition_data.query(f"user_id == '{user_id}'")
-    last_weight_entry = user_nutrition.sort_values(by="Date", ascending=False).head(1)[
+    last_weight_entry = get_nutrition_store(nutrition_data).latest(user_id, 1)[
         "Trend Weight (kg)"
     ]
 
+    if last_weight_entry.empty or not last_weight_entry.iloc[0] > 0:
+        trend_weight = get_rolling_nutrition_stats(nutrition_data, user_id).trend_weight
+        last_weight_entry = pd.Series(
+            [round(trend_weight, 2)], name="Trend Weight (kg)"
+        )
+
     return last_weight_entry
 
 
+def get_weekly_weight_change(nutrition_data: pd.DataFrame, user_id: str) -> float:
+    """
+    Get the change of a user's trend weight per week, over the last 7 days.
+
+    Args:
+        nutrition_data (pd.DataFrame): DataFrame containing nutrition data with columns 'user_id', 'Date', 'Weight (kg)'.
+        user_id (str): The user ID to filter by.
+
+    Returns:
+        float: Kilograms per week, NaN without two weigh-ins.
+    """
+    return get_rolling_nutrition_stats(nutrition_data, user_id).weekly_rate()
+
+
 def get_last_7d_avg_calories_target(
     nutrition_data: pd.DataFrame, user_id: str
 ) -> pd.DataFrame:
@@ -88,16 +349,13 @@ def get_last_7d_avg_calories_target(
     Returns:
         pd.DataFrame: DataFrame with the last 7 days of caloric target for the specified user.
     """
-    nutrition_data["Date"] = pd.to_datetime(nutrition_data["Date"])
-    user_nutrition = nutrition_data.query(f"user_id == '{user_id}'")
-    last_7d_avg_caloric_target = (
-        user_nutrition.query("`Target Calories (kcal)` > 0")
-        .sort_values(by="Date", ascending=False)
-        .head(7)[["Target Calories (kcal)"]]
-        .reset_index(drop=True)
-        .mean()
-        .round(0)
-    )
+    last_7d_avg_caloric_target = pd.Series(
+        {
+            "Target Calories (kcal)": get_rolling_nutrition_stats(
+                nutrition_data, user_id
+            ).average("Target Calories (kcal)", 7)
+        }
+    ).round(0)
 
     return last_7d_avg_caloric_target
 
@@ -115,9 +373,7 @@ def get_last_nutrition_entry_date(
     Returns:
         pd.Timestamp: The last entry date for the specified user.
     """
-    nutrition_data["Date"] = pd.to_datetime(nutrition_data["Date"])
-    user_nutrition = nutrition_data.query(f"user_id == '{user_id}'")
-    last_entry_date = user_nutrition["Date"].max()
+    last_entry_date = get_nutrition_store(nutrition_data).last_date(user_id)
 
     return last_entry_date.strftime("%d-%m-%Y")
 
@@ -135,11 +391,53 @@ def get_nutrition_data_for_user(
     Returns:
         pd.DataFrame: DataFrame containing the nutrition data for the specified user.
     """
-    nutrition_data["Date"] = pd.to_datetime(nutrition_data["Date"])
     user_nutrition = (
-        nutrition_data.query(f"user_id == '{user_id}'")
-        .sort_values(by="Date", ascending=False)
+        get_nutrition_store(nutrition_data)
+        .user(user_id)
+        .iloc[::-1]
         .reset_index(drop=True)
     )
 
     return user_nutrition
+
+
+def get_nutrition_aggregates(
+    nutrition_data: pd.DataFrame,
+    user_id: str,
+    frequency: str = "D",
+    date_range: tuple | None = None,
+) -> pd.DataFrame:
+    """
+    Get the mean of every nutrition column of a user per day, week or month.
+
+    Args:
+        nutrition_data (pd.DataFrame): DataFrame containing nutrition data with columns 'user_id', 'Date', etc.
+        user_id (str): The user ID to filter by.
+        frequency (str): 'D', 'W' or 'M'.
+        date_range (tuple): (start, end) dates of the periods to keep, both included;
+            every period if None.
+
+    Returns:
+        pd.DataFrame: One row per period, oldest first, with a 'Date' column and the means.
+    """
+    start, end = date_range or (None, None)
+    return get_nutrition_store(nutrition_data).between(user_id, start, end, frequency)
+
+
+def get_nutrition_date_range(
+    nutrition_data: pd.DataFrame, user_id: str
+) -> tuple[pd.Timestamp, pd.Timestamp]:
+    """
+    Get the dates of the first and last nutrition entries of a user.
+
+    Args:
+        nutrition_data (pd.DataFrame): DataFrame containing nutrition data with columns 'user_id', 'Date'.
+        user_id (str): The user ID to filter by.
+
+    Returns:
+        tuple[pd.Timestamp, pd.Timestamp]: The first and last dates, NaT without entries.
+    """
+    dates = get_nutrition_store(nutrition_data).dates.get(str(user_id))
+    if dates is None or not len(dates):
+        return pd.NaT, pd.NaT
+    return pd.Timestamp(dates[0]), pd.Timestamp(dates[-1])
@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+
+COLUMN_RENAMES = {
+    "% Min": "perc_min",
+    "% Max": "perc_max",
+    "Carico Min (kg)": "carico_min",
+    "Carico Max (kg)": "carico_max",
+    "Min. Reps": "min_reps",
+    "Max. Reps": "max_reps",
+}
+
+# Cells float() reads as NaN, which parse_numbers cannot tell from text.
+NAN_TEXTS = ["nan", "+nan", "-nan"]
+
+
+def clean_worksheet(worksheet_df: pd.DataFrame, program_id: str) -> pd.DataFrame:
+    """
+    Turn the raw values of a program worksheet into session rows.
+
+    Args:
+        worksheet_df (pd.DataFrame): Raw cell values as returned by the Sheets API.
+        program_id (str): The program ID to attach to every session row.
+
+    Returns:
+        pd.DataFrame: One row per session with numeric cells converted to floats.
+    """
+    text = worksheet_df.astype(str)
+    is_blank = text.apply(lambda column: column.str.strip().eq("")).all(axis=1)
+    df_clean = worksheet_df[~is_blank]
+    text = text[~is_blank]
+
+    header = df_clean.iloc[1]
+    df_clean = df_clean[2:]
+    text = text[2:]
+
+    numbers = parse_numbers(text)
+    is_number = numbers.notna() | text.apply(
+        lambda column: column.str.strip().str.lower().isin(NAN_TEXTS)
+    )
+    has_comma = text.apply(lambda column: column.str.contains(",", regex=False))
+    is_number_row = (is_number & ~has_comma).any(axis=1)
+
+    df_filtered = df_clean[is_number_row]
+    df_filtered.columns = header
+    df_filtered = _fill_numbers(
+        df_filtered,
+        numbers[is_number_row],
+        is_number[is_number_row],
+        text[is_number_row],
+    )
+
+    header_values = np.array(header.tolist(), dtype=object)
+    is_header = (df_filtered.to_numpy() == header_values).all(axis=1)
+    df_filtered = df_filtered[~is_header].reset_index(drop=True)
+
+    df_filtered = df_filtered.rename(columns=COLUMN_RENAMES)
+
+    df_filtered["Exercise"] = df_filtered["Exercise"].str.title()
+    df_filtered["program_id"] = program_id
+    df_filtered["Test"] = df_filtered["Test"].astype(bool)
+    return df_filtered
+
+
+def parse_numbers(text: pd.DataFrame) -> pd.DataFrame:
+    """Parse every cell of a frame of strings as a comma or dot decimal, NaN if it is not one."""
+    return text.apply(
+        lambda column: pd.to_numeric(
+            column.str.replace(",", ".", regex=False), errors="coerce"
+        )
+    )
+
+
+def _fill_numbers(
+    df: pd.DataFrame, numbers: pd.DataFrame, is_number: pd.DataFrame, text: pd.DataFrame
+) -> pd.DataFrame:
+    converted = {}
+    for position in range(df.shape[1]):
+        column = df.iloc[:, position]
+        is_dash = text.iloc[:, position].eq("-")
+        parsed = numbers.iloc[:, position].mask(is_dash, 0.0)
+        is_parsed = is_number.iloc[:, position] | is_dash
+
+        if is_parsed.all():
+            converted[position] = parsed.astype(float)
+        else:
+            converted[position] = column.astype(object).where(~is_parsed, parsed)
+
+    result = pd.DataFrame(converted, index=df.index)
+    result.columns = df.columns
+    return result
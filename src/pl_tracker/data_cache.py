@@ -0,0 +1,121 @@
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+import streamlit as st
+
+
+class DataCache:
+    """
+    Process-wide DataFrames keyed by (user id, table), shared by every session.
+
+    Entries expire ttl_s seconds after they were stored, and the least recently used
+    ones are evicted once the frames together take more than max_bytes. Frames are
+    handed out as shallow copies: replacing a column does not affect other sessions,
+    but values must not be modified in place.
+    """
+
+    def __init__(self, ttl_s: float = 15 * 60, max_bytes: int = 256 * 1024**2):
+        self.ttl_s = ttl_s
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.nbytes = 0
+        self.counts = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, user_id: str, table: str) -> pd.DataFrame | None:
+        """The cached frame of a user's table, or None if missing or expired."""
+        with self.lock:
+            entry = self.entries.get((user_id, table))
+            if entry is not None and time.monotonic() - entry["stored_at"] > self.ttl_s:
+                self._remove((user_id, table))
+                entry = None
+
+            if entry is None:
+                self.counts["misses"] += 1
+                return None
+
+            self.entries.move_to_end((user_id, table))
+            self.counts["hits"] += 1
+            return entry["frame"].copy(deep=False)
+
+    def put(self, user_id: str, table: str, frame: pd.DataFrame):
+        """Store a user's table, evicting the least recently used entries if needed."""
+        nbytes = int(frame.memory_usage(index=True, deep=True).sum())
+        with self.lock:
+            if (user_id, table) in self.entries:
+                self._remove((user_id, table))
+            if nbytes > self.max_bytes:
+                return
+
+            self.entries[(user_id, table)] = {
+                "frame": frame.copy(deep=False),
+                "stored_at": time.monotonic(),
+                "nbytes": nbytes,
+            }
+            self.nbytes += nbytes
+
+            while self.nbytes > self.max_bytes:
+                self._remove(next(iter(self.entries)))
+                self.counts["evictions"] += 1
+
+    def invalidate(self, user_id: str, tables: list[str] | None = None):
+        """Drop the given tables of a user, or all of them."""
+        with self.lock:
+            for key in list(self.entries):
+                if key[0] == user_id and (tables is None or key[1] in tables):
+                    self._remove(key)
+
+    def _remove(self, key):
+        self.nbytes -= self.entries.pop(key)["nbytes"]
+
+    def stats(self) -> dict:
+        """Hit, miss and eviction counts, with the number and size of entries."""
+        with self.lock:
+            return {**self.counts, "entries": len(self.entries), "nbytes": self.nbytes}
+
+
+@st.cache_resource
+def get_data_cache():
+    return DataCache()
+
+
+def fetch_cached(cache: DataCache, table: str, user_ids: list, fetch) -> pd.DataFrame:
+    """
+    The rows of a table for the given users, fetching only those missing from cache.
+
+    Args:
+        cache (DataCache): The shared cache.
+        table (str): Name of the cached table.
+        user_ids (list): Users to return rows for.
+        fetch (callable): Takes a list of user ids and returns their rows in one
+            DataFrame with a user_id column.
+
+    Returns:
+        pd.DataFrame: The rows of every requested user.
+    """
+    frames = {}
+    missing = []
+    for user_id in user_ids:
+        frame = cache.get(user_id, table)
+        if frame is None:
+            missing.append(user_id)
+        else:
+            frames[user_id] = frame
+
+    if missing:
+        fetched = fetch(missing)
+        groups = (
+            dict(list(fetched.groupby("user_id", sort=False, observed=True)))
+            if "user_id" in fetched
+            else {}
+        )
+        for user_id in missing:
+            frames[user_id] = groups.get(user_id, fetched.iloc[:0])
+            cache.put(user_id, table, frames[user_id])
+
+    non_empty = [frames[user_id] for user_id in user_ids if not frames[user_id].empty]
+    if not non_empty:
+        return next(iter(frames.values()), pd.DataFrame())
+    return pd.concat(non_empty, ignore_index=True)
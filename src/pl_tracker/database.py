@@ -1,14 +1,307 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import pandas as pd
-from src.pl_tracker.models import SessionMetadata
+from src.pl_tracker.data_cache import get_data_cache
+from src.pl_tracker.rolling_stats import get_rolling_stats
+from src.pl_tracker.models import BatchReport, SessionMetadata
 from supabase import create_client
 from uuid import uuid4
 from datetime import datetime
 import streamlit as st
 
 
+class ConnectionStats:
+    """Thread-safe counters of clients and HTTP connections opened versus reused."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = {
+            "clients_opened": 0,
+            "clients_reused": 0,
+            "requests": 0,
+            "connections_opened": 0,
+        }
+
+    def increment(self, counter: str):
+        with self.lock:
+            self.counts[counter] += 1
+
+    def trace(self, event_name: str, info: dict):
+        """httpcore trace callback, called with every step of sending a request."""
+        if event_name == "connection.connect_tcp.complete":
+            self.increment("connections_opened")
+
+    def track(self, session):
+        """Count the requests of an httpx session and the connections they open."""
+
+        def on_request(request):
+            self.increment("requests")
+            request.extensions["trace"] = self.trace
+
+        hooks = session.event_hooks
+        hooks["request"] = [*hooks.get("request", []), on_request]
+        session.event_hooks = hooks
+
+    def snapshot(self) -> dict:
+        """Current counts, with requests sent over an already open connection."""
+        with self.lock:
+            counts = dict(self.counts)
+        counts["connections_reused"] = counts["requests"] - counts["connections_opened"]
+        return counts
+
+
+class SupabaseClientPool:
+    """
+    Process-wide SupabaseClients, one per project and key, shared across sessions.
+
+    Each client keeps its keep-alive HTTP session, so reruns and browser sessions
+    reuse open connections instead of building a client and reconnecting.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.clients = {}
+        self.stats = ConnectionStats()
+
+    def get(self, url: str, api_key: str) -> "SupabaseClient":
+        with self.lock:
+            if (url, api_key) in self.clients:
+                self.stats.increment("clients_reused")
+                return self.clients[(url, api_key)]
+
+            client = SupabaseClient(url, api_key)
+            self.stats.track(client.client.postgrest.session)
+            self.clients[(url, api_key)] = client
+            self.stats.increment("clients_opened")
+            return client
+
+
 class SupabaseClient:
-    def __init__(self, url: str, api_key: str):
+    def __init__(self, url: str, api_key: str, rate_limiter=None):
         self.client = create_client(url, api_key)
+        self.rate_limiter = rate_limiter
+
+    def throttle(self):
+        """Wait for the rate limiter, if any, before a Supabase request."""
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+
+    def bulk_upsert(
+        self,
+        table: str,
+        records: list[dict],
+        chunk_size: int = 500,
+        min_chunk_size: int = 1,
+        on_conflict: str = "id",
+    ) -> list[BatchReport]:
+        """
+        Upsert records in chunks, splitting a chunk in half when its request fails.
+
+        Args:
+            table (str): The table to upsert into.
+            records (list[dict]): Rows to write, each containing the conflict columns.
+            chunk_size (int): Number of rows sent per request.
+            min_chunk_size (int): Smallest chunk to retry with before giving up on its rows.
+            on_conflict (str): Comma separated conflict target for the upsert.
+
+        Returns:
+            list[BatchReport]: One report per request sent, including failed ones.
+        """
+        return self._run_in_chunks(
+            table,
+            records,
+            lambda chunk: self.client.table(table)
+            .upsert(chunk, on_conflict=on_conflict)
+            .execute(),
+            chunk_size,
+            min_chunk_size,
+        )
+
+    def bulk_delete(
+        self,
+        table: str,
+        ids: list,
+        chunk_size: int = 200,
+        min_chunk_size: int = 1,
+        id_column: str = "id",
+    ) -> list[BatchReport]:
+        """
+        Delete rows by id in chunks, splitting a chunk in half when its request fails.
+
+        Args:
+            table (str): The table to delete from.
+            ids (list): Values of id_column identifying the rows to delete.
+            chunk_size (int): Number of ids sent per request.
+            min_chunk_size (int): Smallest chunk to retry with before giving up on its rows.
+            id_column (str): The column the ids are matched against.
+
+        Returns:
+            list[BatchReport]: One report per request sent, including failed ones.
+        """
+        return self._run_in_chunks(
+            table,
+            ids,
+            lambda chunk: self.client.table(table)
+            .delete()
+            .in_(id_column, chunk)
+            .execute(),
+            chunk_size,
+            min_chunk_size,
+        )
+
+    def _run_in_chunks(self, table, items, send, chunk_size, min_chunk_size):
+        reports = []
+        pending = [
+            items[start : start + chunk_size]
+            for start in range(0, len(items), chunk_size)
+        ]
+
+        while pending:
+            chunk = pending.pop(0)
+            self.throttle()
+            start = time.perf_counter()
+            try:
+                send(chunk)
+            except Exception as e:
+                latency = time.perf_counter() - start
+                reports.append(
+                    BatchReport(
+                        table=table,
+                        batch=len(reports),
+                        rows=len(chunk),
+                        latency_s=latency,
+                        ok=False,
+                        error=str(e),
+                    )
+                )
+                print(
+                    f"Batch {len(reports) - 1} on {table} failed "
+                    f"({len(chunk)} rows, {latency:.2f}s): {e}"
+                )
+                if len(chunk) > min_chunk_size:
+                    middle = len(chunk) // 2
+                    pending[:0] = [chunk[:middle], chunk[middle:]]
+                continue
+
+            latency = time.perf_counter() - start
+            reports.append(
+                BatchReport(
+                    table=table,
+                    batch=len(reports),
+                    rows=len(chunk),
+                    latency_s=latency,
+                    ok=True,
+                )
+            )
+            print(
+                f"Batch {len(reports) - 1} on {table}: "
+                f"{len(chunk)} rows in {latency:.2f}s"
+            )
+
+        return reports
+
+    def fetch_paged(
+        self,
+        table: str,
+        filters: dict | None = None,
+        columns: str = "*",
+        page_size: int = 1000,
+        workers: int = 4,
+        order_by: str = "id",
+    ) -> tuple[pd.DataFrame, list[BatchReport]]:
+        """
+        Fetch every matching row with concurrent range requests of page_size rows.
+
+        The first page also returns the exact row count, which gives the ranges of
+        the remaining pages; those are requested on a thread pool and each page is
+        turned into a DataFrame as soon as it arrives. Rows are ordered by order_by
+        so pages neither overlap nor miss rows. A page cut short by the server's
+        max-rows setting is completed with further requests, and the remaining pages
+        are sized to that limit. Without a count, pages are requested one after the
+        other until a short page comes back.
+
+        Args:
+            table (str): The table to read.
+            filters (dict | None): Column mapped to the values it must be in.
+            columns (str): Comma separated columns to select.
+            page_size (int): Rows per request; a lower PostgREST max-rows limit is detected.
+            workers (int): Maximum number of pages requested at the same time.
+            order_by (str): Column giving the rows a stable order across requests.
+
+        Returns:
+            tuple[pd.DataFrame, list[BatchReport]]: The rows, in order, and one report
+            per request with its page, row count and latency.
+        """
+
+        def fetch_range(batch, first_row, last_row, count=None):
+            query = self.client.table(table).select(columns, count=count)
+            for column, values in (filters or {}).items():
+                query = query.in_(column, list(values))
+            query = query.order(order_by).range(first_row, last_row)
+
+            self.throttle()
+            start = time.perf_counter()
+            response = query.execute()
+            report = BatchReport(
+                table=table,
+                batch=batch,
+                rows=len(response.data),
+                latency_s=time.perf_counter() - start,
+                ok=True,
+            )
+            return pd.DataFrame(response.data), report, response.count
+
+        def fetch_page(batch, first_row, last_row, total=None, count=None):
+            # A server max-rows setting below the requested range cuts the response
+            # short; the rest of the range is requested until it is filled.
+            frame, report, count_total = fetch_range(batch, first_row, last_row, count)
+            total = count_total if total is None else total
+            frames, reports = [frame], [report]
+            offset = first_row + len(frame)
+            last_expected = last_row if total is None else min(last_row, total - 1)
+            while len(frames[-1]) and offset <= last_expected:
+                frame, report, _ = fetch_range(batch, offset, last_row)
+                frames.append(frame)
+                reports.append(report)
+                offset += len(frame)
+
+            non_empty = [frame for frame in frames if not frame.empty]
+            data = pd.concat(non_empty, ignore_index=True) if non_empty else frames[0]
+            return data, reports, count_total
+
+        first, reports, total = fetch_page(0, 0, page_size - 1, count="exact")
+        pages = {0: first}
+
+        if total is None:
+            while len(pages[len(pages) - 1]) == page_size:
+                frame, page_reports, _ = fetch_page(
+                    len(pages),
+                    len(pages) * page_size,
+                    (len(pages) + 1) * page_size - 1,
+                )
+                pages[len(pages)] = frame
+                reports += page_reports
+        elif total > page_size:
+            # Size the remaining pages to the server's cap when the first page hit it.
+            limit = min(page_size, reports[0].rows or page_size)
+            ranges = [
+                (first_row, min(first_row + limit, total) - 1)
+                for first_row in range(page_size, total, limit)
+            ]
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    executor.submit(fetch_page, page, first_row, last_row, total): page
+                    for page, (first_row, last_row) in enumerate(ranges, start=1)
+                }
+                for future in as_completed(futures):
+                    frame, page_reports, _ = future.result()
+                    pages[futures[future]] = frame
+                    reports += page_reports
+
+        non_empty = [pages[page] for page in sorted(pages) if not pages[page].empty]
+        data = pd.concat(non_empty, ignore_index=True) if non_empty else first
+        return data, sorted(reports, key=lambda report: report.batch)
 
     def upload_nutrition_data(self, nutrition_data: pd.DataFrame, user_id: str):
         """
@@ -65,22 +358,25 @@ class SupabaseClient:
                     .execute()
                 )
 
+                for changed_user_id in to_upload["user_id"].unique():
+                    get_data_cache().invalidate(changed_user_id, ["nutrition"])
+
                 if response:
+                    for changed_user_id in to_upload["user_id"].unique():
+                        get_rolling_stats().update(
+                            changed_user_id,
+                            to_upload[to_upload["user_id"] == changed_user_id],
+                        )
                     return True
         else:
             st.info("No changes detected in your nutrition data.")
 
     def fetch_nutrition_data(self, user_id: str):
         """Fetch nutrition data from the database."""
-        nutrition_data = pd.DataFrame(
-            self.client.table("nutrition")
-            .select("*")
-            .in_("user_id", user_id)
-            .execute()
-            .data
-        )
+        nutrition_data, _ = self.fetch_paged("nutrition", {"user_id": user_id})
 
-        nutrition_data["Date"] = pd.to_datetime(nutrition_data["Date"]).dt.date
+        if not nutrition_data.empty:
+            nutrition_data["Date"] = pd.to_datetime(nutrition_data["Date"]).dt.date
         return nutrition_data
 
     def get_bucket_content(self, bucket: str, user_id: str = None):
@@ -165,6 +461,7 @@ class SupabaseClient:
                 **meta,
             }
         ).execute()
+        get_data_cache().invalidate(user_id, ["videos"])
 
         st.dataframe(st.session_state["videos_data"])
 
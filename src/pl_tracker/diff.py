@@ -0,0 +1,146 @@
+import numpy as np
+import pandas as pd
+
+
+class SessionDiff:
+    """Rows to insert, rows to update with the id they replace, and ids to delete."""
+
+    def __init__(self, inserts: pd.DataFrame, updates: pd.DataFrame, deletes: list):
+        self.inserts = inserts
+        self.updates = updates
+        self.deletes = deletes
+
+    @property
+    def empty(self) -> bool:
+        return self.inserts.empty and self.updates.empty and not self.deletes
+
+    def __len__(self) -> int:
+        return len(self.inserts) + len(self.updates) + len(self.deletes)
+
+
+def _canonical_columns(
+    new_column: pd.Series, old_column: pd.Series
+) -> tuple[pd.Series, pd.Series]:
+    """
+    Bring a column of both sides to one representation so equal values hash equally.
+
+    Columns where every present value on both sides is numeric (booleans included)
+    become float64; anything else becomes strings, with numbers written the same way
+    on both sides. Missing values stay missing.
+    """
+    new_numbers = pd.to_numeric(new_column, errors="coerce")
+    old_numbers = pd.to_numeric(old_column, errors="coerce")
+
+    if (
+        new_numbers.notna().eq(new_column.notna()).all()
+        and old_numbers.notna().eq(old_column.notna()).all()
+    ):
+        return new_numbers.astype(float), old_numbers.astype(float)
+
+    def as_text(column, numbers):
+        text = column.astype(str).where(
+            numbers.isna(), numbers.astype(float).astype(str)
+        )
+        return text.where(column.notna(), None)
+
+    return as_text(new_column, new_numbers), as_text(old_column, old_numbers)
+
+
+def _row_hashes(df: pd.DataFrame, key_columns: list, columns: list) -> pd.DataFrame:
+    """Hash the key and the full row of every row, with its position."""
+    return pd.DataFrame(
+        {
+            "key_hash": pd.util.hash_pandas_object(
+                df[key_columns], index=False
+            ).to_numpy(),
+            "row_hash": pd.util.hash_pandas_object(df[columns], index=False).to_numpy(),
+            "position": np.arange(len(df)),
+        }
+    )
+
+
+def _pair(new: pd.DataFrame, old: pd.DataFrame, on: list, how: str) -> pd.DataFrame:
+    """Merge rows sharing the `on` hashes, pairing repeated ones in order."""
+    new = new.assign(occurrence=new.groupby(on).cumcount())
+    old = old.assign(occurrence=old.groupby(on).cumcount())
+    return new.merge(
+        old,
+        on=on + ["occurrence"],
+        how=how,
+        suffixes=("_new", "_old"),
+        indicator=True,
+    )
+
+
+def diff_sessions(
+    new_rows: pd.DataFrame,
+    old_rows: pd.DataFrame,
+    key_columns: list,
+    value_columns: list,
+    id_column: str = "id",
+) -> SessionDiff:
+    """
+    Diff the session rows of a worksheet against the ones stored in the database.
+
+    Rows are compared on a hash of their key and value columns, so NaN equals NaN.
+    Identical rows are paired first; the remaining rows are matched on a hash of their
+    key columns, rows sharing a key being paired in order.
+
+    Args:
+        new_rows (pd.DataFrame): Cleaned worksheet rows.
+        old_rows (pd.DataFrame): Database rows, including the id column.
+        key_columns (list): Columns identifying a session.
+        value_columns (list): Columns compared between matched rows.
+        id_column (str): Primary key column of the database rows.
+
+    Returns:
+        SessionDiff: New rows without a match, new rows replacing a different matched
+        row (carrying that row's id) and ids of database rows without a match.
+    """
+    columns = key_columns + value_columns
+
+    if old_rows.empty:
+        return SessionDiff(new_rows.copy(), new_rows.iloc[:0].copy(), [])
+
+    new_canonical = pd.DataFrame(index=new_rows.index)
+    old_canonical = pd.DataFrame(index=old_rows.index)
+    for column in columns:
+        new_canonical[column], old_canonical[column] = _canonical_columns(
+            new_rows[column],
+            (
+                old_rows[column]
+                if column in old_rows
+                else pd.Series(None, index=old_rows.index, dtype=object)
+            ),
+        )
+
+    new_hashes = _row_hashes(new_canonical, key_columns, columns)
+    old_hashes = _row_hashes(old_canonical, key_columns, columns)
+
+    # Identical rows are paired first, so rows sharing a key are not reported as
+    # updates just because the database returned them in another order.
+    unchanged = _pair(new_hashes, old_hashes, ["key_hash", "row_hash"], "inner")
+    matched = _pair(
+        new_hashes[~new_hashes["position"].isin(unchanged["position_new"])],
+        old_hashes[~old_hashes["position"].isin(unchanged["position_old"])],
+        ["key_hash"],
+        "outer",
+    )
+
+    inserted = matched[matched["_merge"] == "left_only"]
+    deleted = matched[matched["_merge"] == "right_only"]
+    updated = matched[
+        (matched["_merge"] == "both")
+        & (matched["row_hash_new"] != matched["row_hash_old"])
+    ]
+
+    inserts = new_rows.iloc[inserted["position_new"].astype(int)].copy()
+
+    updates = new_rows.iloc[updated["position_new"].astype(int)].copy()
+    updates[id_column] = (
+        old_rows[id_column].iloc[updated["position_old"].astype(int)].to_numpy()
+    )
+
+    deletes = old_rows[id_column].iloc[deleted["position_old"].astype(int)].tolist()
+
+    return SessionDiff(inserts, updates, deletes)
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Indices of the points Largest-Triangle-Three-Buckets keeps out of a series.
+
+    The first and last points are always kept. The points between them are split
+    into n_out - 2 buckets of consecutive points, and each bucket keeps the point
+    forming the largest triangle with the point kept in the previous bucket and the
+    mean of the next bucket, which preserves the peaks and the overall shape.
+
+    Args:
+        x (np.ndarray): Increasing x values, as numbers.
+        y (np.ndarray): y values, without NaN.
+        n_out (int): Number of points to keep.
+
+    Returns:
+        np.ndarray: Sorted indices of the kept points, every index if the series
+        already has at most n_out points.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = (np.arange(n_out - 1) * (n - 2) / (n_out - 2)).astype(int) + 1
+    edges[-1] = n - 1
+
+    kept = np.empty(n_out, dtype=int)
+    kept[0], kept[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(n_out - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        if bucket + 2 < len(edges):
+            next_x = x[end : edges[bucket + 2]].mean()
+            next_y = y[end : edges[bucket + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+
+        areas = np.abs(
+            (x[previous] - next_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (next_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        kept[bucket + 1] = previous
+    return kept
+
+
+def downsample_frame(
+    frame: pd.DataFrame, x: str, y: str, max_points: int | None
+) -> pd.DataFrame:
+    """
+    Keep at most max_points rows of a frame sorted by x, chosen by LTTB on column y.
+
+    Rows where y is NaN are dropped first. The other columns follow the kept rows.
+    With max_points None the frame is returned unchanged.
+    """
+    if max_points is None or len(frame) <= max_points:
+        return frame
+
+    frame = frame[frame[y].notna()]
+    x_values = frame[x]
+    if pd.api.types.is_datetime64_any_dtype(x_values):
+        x_values = x_values.astype("int64")
+    return frame.iloc[
+        lttb_indices(x_values.to_numpy(), frame[y].to_numpy(), max_points)
+    ]
@@ -0,0 +1,50 @@
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+from src.pl_tracker.fingerprint import data_version
+from src.pl_tracker.memo import LRUCache
+
+
+class FigureCache(LRUCache):
+    """
+    Process-wide Plotly figures keyed by (kind, user id, parameters, data version).
+
+    Figures are shared by every session and returned as stored, so callers must not
+    update the figure they get. The least recently used entries are evicted once more
+    than max_entries are stored.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        super().__init__(max_entries)
+
+
+@st.cache_resource
+def get_figure_cache():
+    return FigureCache()
+
+
+def cached_figure(
+    kind: str, user_id: str, params: dict, data: pd.DataFrame, build
+) -> go.Figure:
+    """
+    The figure of a plot, built only if the cache has none for the same inputs.
+
+    Args:
+        kind (str): Name of the plot.
+        user_id (str): User the plot is about.
+        params (dict): Every other argument the figure depends on.
+        data (pd.DataFrame): The frame the figure is built from.
+        build (callable): Takes no arguments and returns the figure.
+
+    Returns:
+        go.Figure: The cached or newly built figure.
+    """
+    cache = get_figure_cache()
+    key = (kind, str(user_id), tuple(sorted(params.items())), data_version(data))
+
+    fig = cache.get(key)
+    if fig is None:
+        fig = build()
+        cache.put(key, fig)
+    return fig
@@ -0,0 +1,36 @@
+import hashlib
+import pandas as pd
+
+from src.pl_tracker.memo import FrameMemo
+
+
+def fingerprint_frame(df: pd.DataFrame) -> str:
+    """
+    Compute a content fingerprint of a DataFrame.
+
+    The fingerprint covers column names, cell values and row order but not the index,
+    so two frames holding the same rows in the same order share a fingerprint.
+
+    Args:
+        df (pd.DataFrame): The DataFrame to fingerprint.
+
+    Returns:
+        str: Hex digest identifying the frame's content.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr(df.columns.tolist()).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+versions = FrameMemo(fingerprint_frame)
+
+
+def data_version(frame: pd.DataFrame) -> str:
+    """
+    The content fingerprint of a frame, computed once while the frame lives.
+
+    Fingerprints are memoized by the identity of the frame, so a frame must not be
+    modified after its version was taken; replace it with a new frame instead.
+    """
+    return versions(frame)
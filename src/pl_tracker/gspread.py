@@ -5,6 +5,7 @@ from google.oauth2.service_account import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow, Flow
 import pandas as pd
 import gspread
+from gspread.utils import absolute_range_name, fill_gaps
 import os
 from google.auth import default
 
@@ -15,13 +16,14 @@ load_dotenv()
 
 
 class GSpreadClient:
-    def __init__(self, scopes=None):
+    def __init__(self, scopes=None, rate_limiter=None):
         if scopes is None:
             scopes = [
                 "https://www.googleapis.com/auth/spreadsheets",
                 "https://www.googleapis.com/auth/drive",
             ]
         self.scopes = scopes
+        self.rate_limiter = rate_limiter
         self.creds = None
         self.service = None
         self.google_authenticate()
@@ -56,6 +58,11 @@ class GSpreadClient:
         info = json.loads(json_data)
         self.creds = Credentials.from_service_account_info(info, scopes=self.scopes)
 
+    def throttle(self):
+        """Wait for the rate limiter, if any, before a Sheets API request."""
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+
     def _get_gspread_client(self):
         """Get a gspread client using the authenticated credentials."""
         return gspread.authorize(self.creds)
@@ -67,6 +74,7 @@ class GSpreadClient:
     def get_spreadsheet(self, spreadsheet_name):
         """Get values from a specific range in a Google Spreadsheet."""
         if spreadsheet_name not in self.spreadsheets:
+            self.throttle()
             self.spreadsheets[spreadsheet_name] = self.gspread_client.open(
                 spreadsheet_name
             )
@@ -75,10 +83,30 @@ class GSpreadClient:
     def get_worksheet(self, spreadsheet_name, worksheet_name):
         """Get a specific worksheet from a Google Spreadsheet."""
         spreadsheet = self.get_spreadsheet(spreadsheet_name)
+        self.throttle()
         return spreadsheet.worksheet(worksheet_name)
 
     def get_df_from_worksheet(self, spreadsheet_name, worksheet_name):
         """Get a DataFrame from a specific worksheet in a Google Spreadsheet."""
         worksheet = self.get_worksheet(spreadsheet_name, worksheet_name)
+        self.throttle()
         data = worksheet.get_all_values()
         return pd.DataFrame(data) if data else pd.DataFrame()
+
+    def get_dfs_from_worksheets(self, spreadsheet_name, worksheet_names, batch_size=50):
+        """Get DataFrames for many worksheets with one values.batchGet request per batch."""
+        spreadsheet = self.get_spreadsheet(spreadsheet_name)
+        worksheet_names = list(worksheet_names)
+
+        dfs = {}
+        for start in range(0, len(worksheet_names), batch_size):
+            names = worksheet_names[start : start + batch_size]
+            self.throttle()
+            response = spreadsheet.values_batch_get(
+                [absolute_range_name(name) for name in names]
+            )
+            for name, value_range in zip(names, response.get("valueRanges", [])):
+                data = value_range.get("values", [])
+                dfs[name] = pd.DataFrame(fill_gaps(data)) if data else pd.DataFrame()
+
+        return dfs
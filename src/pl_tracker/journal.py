@@ -0,0 +1,100 @@
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+
+
+class SyncJournal:
+    """
+    Append-only JSONL journal of sync checkpoints, used to resume an interrupted run.
+
+    Every entry is one line with an "event" and the spreadsheet and worksheet it
+    refers to:
+
+    - "program_started": a new program got its id, before anything was written.
+    - "batch_written": one batch of a new program's sessions is in the database.
+    - "worksheet_done": every row of the worksheet is in the database.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.lock = threading.Lock()
+        self.entries = []
+        if self.path.exists():
+            with open(self.path) as f:
+                for line in f:
+                    try:
+                        self.entries.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        # A line cut short by a crash while it was being written.
+                        continue
+
+    def record(self, event: str, spreadsheet: str, worksheet: str, **fields):
+        """Append an entry and flush it to disk before returning."""
+        entry = {
+            "event": event,
+            "spreadsheet": spreadsheet,
+            "worksheet": worksheet,
+            "at": datetime.now(timezone.utc).isoformat(),
+            **fields,
+        }
+        with self.lock:
+            with open(self.path, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self.entries.append(entry)
+
+    def _worksheet_entries(self, spreadsheet: str, worksheet: str) -> list[dict]:
+        with self.lock:
+            return [
+                entry
+                for entry in self.entries
+                if entry["spreadsheet"] == spreadsheet
+                and entry["worksheet"] == worksheet
+            ]
+
+    def pending_program(self, spreadsheet: str, worksheet: str) -> dict | None:
+        """
+        The "program_started" entry of a new program that was never finished.
+
+        Returns:
+            dict | None: The entry, holding the program id and rows fingerprint, or
+            None when the worksheet has no unfinished program.
+        """
+        pending = None
+        for entry in self._worksheet_entries(spreadsheet, worksheet):
+            if entry["event"] == "program_started":
+                pending = entry
+            elif entry["event"] == "worksheet_done":
+                pending = None
+        return pending
+
+    def written_batches(self, spreadsheet: str, worksheet: str, program_id: str) -> set:
+        """Indexes of the batches of a new program already in the database."""
+        return {
+            entry["batch"]
+            for entry in self._worksheet_entries(spreadsheet, worksheet)
+            if entry["event"] == "batch_written" and entry["program_id"] == program_id
+        }
+
+    def replay(self, state):
+        """Record every finished worksheet in the sync state, oldest first."""
+        with self.lock:
+            entries = list(self.entries)
+
+        for entry in entries:
+            if entry["event"] == "worksheet_done":
+                state.record_worksheet(
+                    entry["spreadsheet"],
+                    entry["worksheet"],
+                    entry["sheet_fingerprint"],
+                    entry["rows_fingerprint"],
+                )
+
+    def clear(self):
+        """Drop every entry once a run completed and its state was saved."""
+        with self.lock:
+            self.path.write_text("")
+            self.entries = []
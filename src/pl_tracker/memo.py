@@ -0,0 +1,70 @@
+import threading
+import weakref
+from collections import OrderedDict
+
+import pandas as pd
+
+
+class FrameMemo:
+    """
+    Values computed from a frame, built on first use and kept while the frame lives.
+
+    Values are keyed by the identity of the frame, so a frame must not be modified
+    after a value was computed from it; replace it with a new frame instead.
+    """
+
+    def __init__(self, compute):
+        self.compute = compute
+        self.lock = threading.Lock()
+        self.entries = {}
+
+    def __call__(self, frame: pd.DataFrame):
+        key = id(frame)
+        with self.lock:
+            if key in self.entries and self.entries[key][0]() is frame:
+                return self.entries[key][1]
+
+        value = self.compute(frame)
+
+        def forget(_, key=key):
+            with self.lock:
+                if key in self.entries and self.entries[key][0]() is None:
+                    del self.entries[key]
+
+        with self.lock:
+            self.entries[key] = (weakref.ref(frame, forget), value)
+        return value
+
+
+class LRUCache:
+    """Thread-safe mapping keeping the max_entries most recently used values."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.counts = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, key):
+        """The value of a key, or None if missing."""
+        with self.lock:
+            if key not in self.entries:
+                self.counts["misses"] += 1
+                return None
+            self.entries.move_to_end(key)
+            self.counts["hits"] += 1
+            return self.entries[key]
+
+    def put(self, key, value):
+        """Store a value, evicting the least recently used ones if needed."""
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.counts["evictions"] += 1
+
+    def stats(self) -> dict:
+        """Hit, miss and eviction counts, with the number of entries."""
+        with self.lock:
+            return {**self.counts, "entries": len(self.entries)}
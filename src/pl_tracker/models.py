@@ -6,3 +6,29 @@ class SessionMetadata(BaseModel):
     week: int
     day: int
     exercise: str
+
+
+class BatchReport(BaseModel):
+    table: str
+    batch: int
+    rows: int
+    latency_s: float
+    ok: bool
+    error: str | None = None
+
+
+class SyncResult(BaseModel):
+    program: str
+    rows: int = 0
+    ok: bool = True
+    skipped: bool = False
+    error: str | None = None
+
+
+class AthleteReport(BaseModel):
+    user_id: str
+    spreadsheet: str
+    elapsed_s: float
+    timings: dict[str, float] = {}
+    results: list[SyncResult] = []
+    error: str | None = None
@@ -0,0 +1,123 @@
+import numpy as np
+import pandas as pd
+
+from src.pl_tracker.memo import FrameMemo
+
+# Frequencies of the aggregate cube, with the offset each one is resampled with.
+AGGREGATE_FREQUENCIES = {"D": "D", "W": "W", "M": "ME"}
+
+
+class NutritionStore:
+    """
+    Nutrition rows split by user once, each partition sorted by date.
+
+    Lookups binary-search the sorted dates of one partition instead of scanning and
+    sorting the whole frame. The frame the store is built from is not modified.
+    """
+
+    def __init__(self, nutrition_data: pd.DataFrame):
+        frame = nutrition_data.assign(Date=pd.to_datetime(nutrition_data["Date"]))
+        self.columns = frame.columns
+        self.partitions = {}
+        self.dates = {}
+        self.cubes = {}
+
+        if "user_id" not in frame:
+            return
+        for user_id, partition in frame.groupby("user_id", sort=False, observed=True):
+            partition = partition.sort_values("Date", kind="stable").reset_index(
+                drop=True
+            )
+            self.partitions[str(user_id)] = partition
+            self.dates[str(user_id)] = partition["Date"].to_numpy()
+
+    def user(self, user_id: str) -> pd.DataFrame:
+        """All rows of a user, oldest first."""
+        user_id = str(user_id)
+        if user_id not in self.partitions:
+            return pd.DataFrame(columns=self.columns)
+        return self.partitions[user_id]
+
+    def latest(self, user_id: str, n: int) -> pd.DataFrame:
+        """The n most recent rows of a user, most recent first."""
+        return self.user(user_id).iloc[: -n - 1 : -1].reset_index(drop=True)
+
+    def between(
+        self, user_id: str, start=None, end=None, frequency: str | None = None
+    ) -> pd.DataFrame:
+        """
+        Rows of a user dated from start to end, both included, oldest first.
+
+        With a frequency the periods of aggregates() are windowed instead, by the
+        date labelling each period.
+        """
+        if frequency is None:
+            rows = self.user(user_id)
+            dates = self.dates.get(str(user_id), np.array([], dtype="datetime64[ns]"))
+        else:
+            rows = self.aggregates(user_id, frequency)
+            dates = rows["Date"].to_numpy()
+        lower = (
+            0
+            if start is None
+            else np.searchsorted(dates, pd.Timestamp(start).to_datetime64())
+        )
+        upper = (
+            len(dates)
+            if end is None
+            else np.searchsorted(dates, pd.Timestamp(end).to_datetime64(), side="right")
+        )
+        return rows.iloc[lower:upper]
+
+    def aggregates(self, user_id: str, frequency: str) -> pd.DataFrame:
+        """
+        Means of every numeric column of a user per day ("D"), week ("W") or month ("M").
+
+        The cube of a user is built on first use from one pass over their rows: daily
+        sums and counts are resampled to each frequency, and each mean is the sum of
+        a period divided by its count. Periods without values are NaN, as with
+        pd.Grouper.
+        """
+        user_id = str(user_id)
+        if user_id not in self.cubes:
+            self.cubes[user_id] = self._build_cube(self.user(user_id))
+        return self.cubes[user_id][frequency]
+
+    @staticmethod
+    def _build_cube(partition: pd.DataFrame) -> dict:
+        if partition.empty:
+            empty = pd.DataFrame(columns=partition.columns)
+            return {frequency: empty for frequency in AGGREGATE_FREQUENCIES}
+
+        columns = partition.select_dtypes("number").columns
+
+        values = partition[columns].astype(float).set_index(partition["Date"])
+        daily = values.resample("D")
+        daily_sums, daily_counts = daily.sum(), daily.count()
+
+        cube = {}
+        for frequency, offset in AGGREGATE_FREQUENCIES.items():
+            sums = daily_sums.resample(offset).sum()
+            counts = daily_counts.resample(offset).sum()
+            cube[frequency] = (sums / counts.where(counts > 0)).reset_index()
+        return cube
+
+    def last_date(self, user_id: str) -> pd.Timestamp:
+        """Date of the most recent row of a user, NaT without rows."""
+        dates = self.dates.get(str(user_id))
+        if dates is None or not len(dates):
+            return pd.NaT
+        return pd.Timestamp(dates[-1])
+
+
+stores = FrameMemo(NutritionStore)
+
+
+def get_nutrition_store(nutrition_data: pd.DataFrame) -> NutritionStore:
+    """
+    The store of a nutrition frame, built on first use and kept while the frame lives.
+
+    Stores are keyed by the identity of the frame, so a frame must not be modified
+    after its store was built; replace it with a new frame instead.
+    """
+    return stores(nutrition_data)
@@ -12,6 +12,7 @@ from src.pl_tracker.database import SupabaseClient
 import pandas as pd
 import plotly.graph_objects as go
 from src.pl_tracker.plots import (
+    max_points_for,
     plot_1rm_progress,
     plot_calories_per_day,
     plot_expenditure_per_day,
@@ -101,23 +102,31 @@ col1, col2 = st.columns(2)
 
 with col1:
     plot_steps_per_day(
-        st.session_state["nutrition_data"], st.session_state["selected_user_id"]
+        st.session_state["nutrition_data"],
+        st.session_state["selected_user_id"],
+        max_points=max_points_for(2),
     )
 
 with col2:
     plot_calories_per_day(
-        st.session_state["nutrition_data"], st.session_state["selected_user_id"]
+        st.session_state["nutrition_data"],
+        st.session_state["selected_user_id"],
+        max_points=max_points_for(2),
     )
 
 col3, col4 = st.columns(2)
 with col3:
     plot_expenditure_per_day(
-        st.session_state["nutrition_data"], st.session_state["selected_user_id"]
+        st.session_state["nutrition_data"],
+        st.session_state["selected_user_id"],
+        max_points=max_points_for(2),
     )
 
 with col4:
     plot_weight_per_day(
-        st.session_state["nutrition_data"], st.session_state["selected_user_id"]
+        st.session_state["nutrition_data"],
+        st.session_state["selected_user_id"],
+        max_points=max_points_for(2),
     )
 
 
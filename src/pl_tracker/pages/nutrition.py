@@ -1,5 +1,6 @@
 from uuid import uuid4
 import uuid
+import numpy as np
 import pandas as pd
 import streamlit as st
 import plotly.express as px
@@ -9,8 +10,11 @@ from src.pl_tracker.calculations import (
     get_last_7d_avg_calories_target,
     get_last_weight_entry,
     get_nutrition_data_for_user,
+    get_nutrition_date_range,
+    get_weekly_weight_change,
 )
 from src.pl_tracker.plots import (
+    max_points_for,
     plot_calories_per_day,
     plot_expenditure_per_day,
     plot_macros_per_day,
@@ -21,6 +25,10 @@ from src.pl_tracker.plots import (
 st.header("Nutrition")
 
 
+weekly_weight_change = get_weekly_weight_change(
+    st.session_state["nutrition_data"], st.session_state["selected_user_id"]
+)
+
 col1, col2 = st.columns(2)
 
 with col1:
@@ -29,6 +37,12 @@ with col1:
         value=get_last_weight_entry(
             st.session_state["nutrition_data"], st.session_state["selected_user_id"]
         ),
+        delta=(
+            None
+            if np.isnan(weekly_weight_change)
+            else f"{weekly_weight_change:+.2f} kg/week"
+        ),
+        delta_color="off",
         help="lol",
     )
 
@@ -55,10 +69,36 @@ time_resolution = st.selectbox(
     help="Select the time resolution for the plots.",
 )
 
+fast_rendering = st.toggle(
+    "Fast rendering",
+    value=True,
+    help="Downsample long histories to the points the plots can show.",
+)
+
+date_range = None
+first_date, last_date = get_nutrition_date_range(
+    st.session_state["nutrition_data"], st.session_state["selected_user_id"]
+)
+if not pd.isna(first_date):
+    date_window = st.date_input(
+        "Date window",
+        value=(first_date.date(), last_date.date()),
+        min_value=first_date.date(),
+        max_value=last_date.date(),
+        help="Narrow the window to see it at full resolution.",
+    )
+    if len(date_window) == 2:
+        date_range = tuple(date_window)
+
+full_width_points = max_points_for(1) if fast_rendering else None
+half_width_points = max_points_for(2) if fast_rendering else None
+
 plot_weight_per_day(
     st.session_state["nutrition_data"],
     st.session_state["selected_user_id"],
     time_resolution,
+    date_range,
+    full_width_points,
 )
 
 col1, col2 = st.columns(2)
@@ -67,12 +107,16 @@ with col1:
         st.session_state["nutrition_data"],
         st.session_state["selected_user_id"],
         time_resolution,
+        date_range,
+        half_width_points,
     )
 with col2:
     plot_macros_per_day(
         st.session_state["nutrition_data"],
         st.session_state["selected_user_id"],
         time_resolution,
+        date_range,
+        half_width_points,
     )
 
 col1, col2 = st.columns(2)
@@ -81,6 +125,8 @@ with col1:
         st.session_state["nutrition_data"],
         st.session_state["selected_user_id"],
         time_resolution,
+        date_range,
+        half_width_points,
     )
 
 with col2:
@@ -88,6 +134,8 @@ with col2:
         st.session_state["nutrition_data"],
         st.session_state["selected_user_id"],
         time_resolution,
+        date_range,
+        half_width_points,
     )
 
 
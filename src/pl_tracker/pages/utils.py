@@ -1,4 +1,5 @@
 import streamlit as st
+from src.pl_tracker.auth import load_athlete
 
 
 def common_nav():
@@ -26,6 +27,7 @@ def common_nav():
                 for user in st.session_state["users_list"]
                 if user["name"] == username
             ][0]
+            load_athlete(st.session_state["selected_user_id"])
 
     # if not st.user["email_verified"]:
     #     st.warning("Please verify your email and login back to unlock all features")
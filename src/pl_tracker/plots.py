@@ -1,13 +1,26 @@
 import plotly.express as px
 import pandas as pd
 from src.pl_tracker.calculations import (
-    compute_1rm_tests,
+    compute_1rm_progression,
     compute_sets_per_week,
-    get_nutrition_data_for_user,
+    get_nutrition_aggregates,
 )
+from src.pl_tracker.downsampling import downsample_frame
+from src.pl_tracker.figure_cache import cached_figure
 import streamlit as st
 import plotly.graph_objects as go
 
+# Points a plot as wide as the page can show before neighbouring points overlap.
+FULL_WIDTH_POINTS = 1200
+
+# Line charts with more points than this are drawn with WebGL instead of SVG.
+WEBGL_THRESHOLD = 1000
+
+
+def max_points_for(columns: int) -> int:
+    """Number of points to downsample to for a plot in one of `columns` page columns."""
+    return FULL_WIDTH_POINTS // columns
+
 
 def map_time_resolution_to_frequency(time_resolution: str) -> str:
     """
@@ -27,79 +40,28 @@ def map_time_resolution_to_frequency(time_resolution: str) -> str:
         return "D"
 
 
-def plot_1rm_progress(
+def build_1rm_progress_figure(
     user_sessions: pd.DataFrame, time_definition: str = "Program", program: str = None
-) -> px.line:
+) -> go.Figure:
     """
-    Plot the 1RM progress for each user and exercise.
+    Build the figure of the 1RM progress for each user and exercise.
 
     Args:
         user_sessions (pd.DataFrame): DataFrame containing session data with columns 'name', 'Exercise', '1rm_th'.
 
     Returns:
-        px.line: Plotly line chart showing the 1RM progress.
+        go.Figure: Bars per exercise and total, with the total's trend line.
     """
-    if program:
-        user_sessions = user_sessions.query(f"name == '{program}'")
-        key = f"{time_definition}_1rm_plot_{program}"
-    else:
-        key = f"{time_definition}_1rm_plot"
-
-    exercises = ["Squat", "Panca", "Stacco", "Sumo"]
-
-    exercise_sessions = user_sessions[user_sessions["Exercise"].isin(exercises)]
-
-    if time_definition == "Program":
-        groupby = "name"
-        group_type = "sum"
-
-        max_rm = compute_1rm_tests(exercise_sessions, groupby)
-
-        total_progression = (
-            max_rm.groupby([groupby] + ["date"], as_index=False)
-            .agg({"1rm_th": group_type})
-            .reset_index()
-            .round()
-            .sort_values("date")
-        )
-
-    elif time_definition == "Weekly":
-        groupby = "program_week"
-        group_type = "mean"
-
-        max_rm = compute_1rm_tests(exercise_sessions, groupby)
-
-        max_rm = (
-            max_rm.loc[max_rm["1rm_th"] != 0, :]
-            .groupby(["program_week", "date", "Exercise"], as_index=False)["1rm_th"]
-            .mean()
-            .reset_index()
-        )
-
-        max_rm = (
-            max_rm.groupby([groupby] + ["date", "Exercise"], as_index=False)["1rm_th"]
-            .mean()
-            .reset_index()
-        )
-
-        total_progression = (
-            max_rm.groupby([groupby] + ["date", "Exercise"], as_index=False)
-            .agg({"1rm_th": group_type})
-            .groupby(["date", "program_week"])["1rm_th"]
-            .sum()
-            .reset_index()
-            .round()
-            .sort_values(["date", "program_week"])
-        )
+    progression = compute_1rm_progression(user_sessions, time_definition, program)
+    total_progression = progression[progression["Exercise"] == "Total"]
+    exercise_progression = progression[progression["Exercise"] != "Total"]
 
     fig = go.Figure()
 
-    trend_line = total_progression.sort_values(["date", groupby])
-
     fig.add_trace(
         go.Scatter(
-            x=trend_line[groupby],
-            y=trend_line["1rm_th"],
+            x=total_progression["period"],
+            y=total_progression["1rm_th"],
             mode="lines+markers",
             name="Total (Trend)",
             line=dict(color="blue", dash="dash"),
@@ -109,7 +71,7 @@ def plot_1rm_progress(
 
     fig.add_trace(
         go.Bar(
-            x=total_progression[groupby],
+            x=total_progression["period"],
             y=total_progression["1rm_th"],
             name="Total",
             marker=dict(color="red"),
@@ -123,11 +85,13 @@ def plot_1rm_progress(
         "Sumo": "cyan",
     }
 
-    for exercise in max_rm["Exercise"].unique():
-        exercise_data = max_rm[max_rm["Exercise"] == exercise]
+    for exercise in exercise_progression["Exercise"].unique():
+        exercise_data = exercise_progression[
+            exercise_progression["Exercise"] == exercise
+        ]
         fig.add_trace(
             go.Bar(
-                x=exercise_data[groupby],
+                x=exercise_data["period"],
                 y=exercise_data["1rm_th"],
                 name=f"{exercise}",
                 marker=dict(color=exercise_colors.get(exercise, "gray")),
@@ -139,22 +103,42 @@ def plot_1rm_progress(
         title="1RM Development",
         xaxis=dict(title="Program Name", dtick=1),
         yaxis=dict(
-            title="Weight (kg)", range=[0, max(total_progression["1rm_th"]) * 1.1]
+            title="Weight (kg)", range=[0, total_progression["1rm_th"].max() * 1.1]
         ),
     )
 
     fig.update_yaxes(matches="y")
 
+    return fig
+
+
+def plot_1rm_progress(
+    user_sessions: pd.DataFrame, time_definition: str = "Program", program: str = None
+) -> go.Figure:
+    """Display build_1rm_progress_figure, reusing the cached figure for the same inputs."""
+    if program:
+        key = f"{time_definition}_1rm_plot_{program}"
+    else:
+        key = f"{time_definition}_1rm_plot"
+
+    fig = cached_figure(
+        "1rm_progress",
+        st.session_state.get("selected_user_id"),
+        {"time_definition": time_definition, "program": program},
+        user_sessions,
+        lambda: build_1rm_progress_figure(user_sessions, time_definition, program),
+    )
+
     st.plotly_chart(fig, use_container_width=True, key=key)
 
     return fig
 
 
-def plot_sets_per_week(
+def build_sets_per_week_figure(
     user_sessions: pd.DataFrame, exercise: str, program: str = None, type: str = "Line"
-) -> px.line:
+) -> go.Figure:
     """
-    Plot the total sets per week for a given exercise.
+    Build the figure of the total sets per week for a given exercise.
 
     Args:
         user_sessions (pd.DataFrame): DataFrame containing session data with columns 'name', 'Week', 'Exercise', 'Sets'.
@@ -168,7 +152,9 @@ def plot_sets_per_week(
 
     if exercise == "All":
         sets_per_week = (
-            sets_per_week.groupby(["date", "program_week"], as_index=False)
+            sets_per_week.groupby(
+                ["date", "program_week"], as_index=False, observed=True
+            )
             .agg(total_sets=("total_sets", "sum"))
             .sort_values(["date", "program_week"])
         )
@@ -191,22 +177,39 @@ def plot_sets_per_week(
 
     fig.update_xaxes(dtick=1)
 
+    return fig
+
+
+def plot_sets_per_week(
+    user_sessions: pd.DataFrame, exercise: str, program: str = None, type: str = "Line"
+) -> go.Figure:
+    """Display build_sets_per_week_figure, reusing the cached figure for the same inputs."""
+    fig = cached_figure(
+        "sets_per_week",
+        st.session_state.get("selected_user_id"),
+        {"exercise": exercise, "program": program, "type": type},
+        user_sessions,
+        lambda: build_sets_per_week_figure(user_sessions, exercise, program, type),
+    )
+
     st.plotly_chart(fig, use_container_width=True)
 
     return fig
 
 
-def plot_macros_per_day(
-    nutrition_data: pd.DataFrame, user_id: str, time_resolution: str = "Daily"
-) -> None:
+def build_macros_per_day_figure(
+    nutrition_data: pd.DataFrame,
+    user_id: str,
+    time_resolution: str = "Daily",
+    date_range: tuple | None = None,
+    max_points: int | None = None,
+) -> go.Figure:
     frequency = map_time_resolution_to_frequency(time_resolution)
 
-    macros_data = (
-        get_nutrition_data_for_user(nutrition_data, user_id)
-        .groupby(pd.Grouper(key="Date", freq=frequency))
-        .agg({"Protein (%)": "mean", "Carbs (%)": "mean", "Fat (%)": "mean"})
-        .reset_index()
-    )
+    macros_data = get_nutrition_aggregates(
+        nutrition_data, user_id, frequency, date_range
+    )[["Date", "Protein (%)", "Carbs (%)", "Fat (%)"]]
+    macros_data = downsample_frame(macros_data, "Date", "Protein (%)", max_points)
 
     fig = px.bar(
         macros_data,
@@ -217,29 +220,56 @@ def plot_macros_per_day(
 
     fig.update_xaxes(rangeslider_visible=True)
 
-    return st.plotly_chart(fig, use_container_width=True)
+    return fig
 
 
-def plot_steps_per_day(
-    nutrition_data: pd.DataFrame, user_id: str, time_resolution: str = "Daily"
+def plot_macros_per_day(
+    nutrition_data: pd.DataFrame,
+    user_id: str,
+    time_resolution: str = "Daily",
+    date_range: tuple | None = None,
+    max_points: int | None = None,
 ) -> None:
+    """Display build_macros_per_day_figure, reusing the cached figure for the same inputs."""
+    fig = cached_figure(
+        "macros_per_day",
+        user_id,
+        {
+            "time_resolution": time_resolution,
+            "date_range": date_range,
+            "max_points": max_points,
+        },
+        nutrition_data,
+        lambda: build_macros_per_day_figure(
+            nutrition_data, user_id, time_resolution, date_range, max_points
+        ),
+    )
+
+    return st.plotly_chart(fig, use_container_width=True)
+
+
+def build_steps_per_day_figure(
+    nutrition_data: pd.DataFrame,
+    user_id: str,
+    time_resolution: str = "Daily",
+    date_range: tuple | None = None,
+    max_points: int | None = None,
+) -> go.Figure:
     """
-    Plot the steps per day for a given user.
+    Build the figure of the steps per day for a given user.
 
     Args:
         nutrition_data (pd.DataFrame): DataFrame containing nutrition data with columns 'user_id', 'Date', 'Steps'.
 
     Returns:
-        None: Displays the plot using Streamlit.
+        go.Figure: The figure, not yet displayed.
     """
     frequency = map_time_resolution_to_frequency(time_resolution)
 
-    step_data = (
-        get_nutrition_data_for_user(nutrition_data, user_id)
-        .groupby(pd.Grouper(key="Date", freq=frequency))
-        .agg({"Steps": "mean"})
-        .reset_index()
-    )
+    step_data = get_nutrition_aggregates(
+        nutrition_data, user_id, frequency, date_range
+    )[["Date", "Steps"]]
+    step_data = downsample_frame(step_data, "Date", "Steps", max_points)
 
     fig = px.bar(
         step_data,
@@ -250,29 +280,61 @@ def plot_steps_per_day(
 
     fig.update_xaxes(rangeslider_visible=True)
 
-    return st.plotly_chart(fig, use_container_width=True)
+    return fig
 
 
-def plot_calories_per_day(
-    nutrition_data: pd.DataFrame, user_id: str, time_resolution: str = "Daily"
+def plot_steps_per_day(
+    nutrition_data: pd.DataFrame,
+    user_id: str,
+    time_resolution: str = "Daily",
+    date_range: tuple | None = None,
+    max_points: int | None = None,
 ) -> None:
+    """Display build_steps_per_day_figure, reusing the cached figure for the same inputs."""
+    fig = cached_figure(
+        "steps_per_day",
+        user_id,
+        {
+            "time_resolution": time_resolution,
+            "date_range": date_range,
+            "max_points": max_points,
+        },
+        nutrition_data,
+        lambda: build_steps_per_day_figure(
+            nutrition_data, user_id, time_resolution, date_range, max_points
+        ),
+    )
+
+    return st.plotly_chart(fig, use_container_width=True)
+
+
+def build_calories_per_day_figure(
+    nutrition_data: pd.DataFrame,
+    user_id: str,
+    time_resolution: str = "Daily",
+    date_range: tuple | None = None,
+    max_points: int | None = None,
+) -> go.Figure:
     """
-    Plot the calories per day for a given user.
+    Build the figure of the calories per day for a given user.
 
     Args:
         nutrition_data (pd.DataFrame): DataFrame containing nutrition data with columns 'user_id', 'Date', 'Calories (kcal)'.
 
     Returns:
-        None: Displays the plot using Streamlit.
+        go.Figure: The figure, not yet displayed.
     """
 
     frequency = map_time_resolution_to_frequency(time_resolution)
 
-    calories_data = (
-        get_nutrition_data_for_user(nutrition_data, user_id)
-        .groupby(pd.Grouper(key="Date", freq=frequency))
-        .agg({"Calories (kcal)": "mean"})
-        .reset_index()
+    calories_data = get_nutrition_aggregates(
+        nutrition_data, user_id, frequency, date_range
+    )[["Date", "Calories (kcal)"]]
+    calories_data = downsample_frame(
+        calories_data,
+        "Date",
+        "Calories (kcal)",
+        max_points,
     )
 
     fig = px.bar(
@@ -285,28 +347,60 @@ def plot_calories_per_day(
 
     fig.update_xaxes(rangeslider_visible=True)
 
-    return st.plotly_chart(fig, use_container_width=True)
+    return fig
 
 
-def plot_expenditure_per_day(
-    nutrition_data: pd.DataFrame, user_id: str, time_resolution: str = "Daily"
+def plot_calories_per_day(
+    nutrition_data: pd.DataFrame,
+    user_id: str,
+    time_resolution: str = "Daily",
+    date_range: tuple | None = None,
+    max_points: int | None = None,
 ) -> None:
+    """Display build_calories_per_day_figure, reusing the cached figure for the same inputs."""
+    fig = cached_figure(
+        "calories_per_day",
+        user_id,
+        {
+            "time_resolution": time_resolution,
+            "date_range": date_range,
+            "max_points": max_points,
+        },
+        nutrition_data,
+        lambda: build_calories_per_day_figure(
+            nutrition_data, user_id, time_resolution, date_range, max_points
+        ),
+    )
+
+    return st.plotly_chart(fig, use_container_width=True)
+
+
+def build_expenditure_per_day_figure(
+    nutrition_data: pd.DataFrame,
+    user_id: str,
+    time_resolution: str = "Daily",
+    date_range: tuple | None = None,
+    max_points: int | None = None,
+) -> go.Figure:
     """
-    Plot the expenditure per day for a given user.
+    Build the figure of the expenditure per day for a given user.
 
     Args:
         nutrition_data (pd.DataFrame): DataFrame containing nutrition data with columns 'user_id', 'Date', 'Expenditure'.
 
     Returns:
-        None: Displays the plot using Streamlit.
+        go.Figure: The figure, not yet displayed.
     """
     frequency = map_time_resolution_to_frequency(time_resolution)
 
-    expenditure_data = (
-        get_nutrition_data_for_user(nutrition_data, user_id)
-        .groupby(pd.Grouper(key="Date", freq=frequency))
-        .agg({"Expenditure": "mean"})
-        .reset_index()
+    expenditure_data = get_nutrition_aggregates(
+        nutrition_data, user_id, frequency, date_range
+    )[["Date", "Expenditure"]]
+    expenditure_data = downsample_frame(
+        expenditure_data,
+        "Date",
+        "Expenditure",
+        max_points,
     )
     fig = px.bar(
         expenditure_data,
@@ -317,36 +411,69 @@ def plot_expenditure_per_day(
 
     fig.update_xaxes(rangeslider_visible=True)
 
-    return st.plotly_chart(fig, use_container_width=True)
+    return fig
 
 
-def plot_weight_per_day(
-    nutrition_data: pd.DataFrame, user_id: str, time_resolution: str = "Daily"
+def plot_expenditure_per_day(
+    nutrition_data: pd.DataFrame,
+    user_id: str,
+    time_resolution: str = "Daily",
+    date_range: tuple | None = None,
+    max_points: int | None = None,
 ) -> None:
+    """Display build_expenditure_per_day_figure, reusing the cached figure for the same inputs."""
+    fig = cached_figure(
+        "expenditure_per_day",
+        user_id,
+        {
+            "time_resolution": time_resolution,
+            "date_range": date_range,
+            "max_points": max_points,
+        },
+        nutrition_data,
+        lambda: build_expenditure_per_day_figure(
+            nutrition_data, user_id, time_resolution, date_range, max_points
+        ),
+    )
+
+    return st.plotly_chart(fig, use_container_width=True)
+
+
+def build_weight_per_day_figure(
+    nutrition_data: pd.DataFrame,
+    user_id: str,
+    time_resolution: str = "Daily",
+    date_range: tuple | None = None,
+    max_points: int | None = None,
+) -> go.Figure:
     """
-    Plot the weight per day for a given user.
+    Build the figure of the weight per day for a given user.
 
     Args:
         nutrition_data (pd.DataFrame): DataFrame containing nutrition data with columns 'user_id', 'Date', 'Weight (kg)'.
 
     Returns:
-        None: Displays the plot using Streamlit.
+        go.Figure: The figure, not yet displayed.
     """
     fig = go.Figure()
 
     frequency = map_time_resolution_to_frequency(time_resolution)
 
-    user_nutrition = (
-        get_nutrition_data_for_user(nutrition_data, user_id)
-        .groupby(pd.Grouper(key="Date", freq=frequency))
-        .agg({"Weight (kg)": "mean", "Trend Weight (kg)": "mean"})
-        .reset_index()
-    )
+    user_nutrition = get_nutrition_aggregates(
+        nutrition_data, user_id, frequency, date_range
+    )[["Date", "Weight (kg)", "Trend Weight (kg)"]]
 
     user_nutrition = user_nutrition.loc[user_nutrition["Weight (kg)"] > 0, :]
+    user_nutrition = downsample_frame(
+        user_nutrition,
+        "Date",
+        "Weight (kg)",
+        max_points,
+    )
+    scatter = go.Scattergl if len(user_nutrition) > WEBGL_THRESHOLD else go.Scatter
 
     fig.add_trace(
-        go.Scatter(
+        scatter(
             x=user_nutrition["Date"],
             y=user_nutrition["Weight (kg)"],
             mode="lines+markers",
@@ -355,7 +482,7 @@ def plot_weight_per_day(
     )
 
     fig.add_trace(
-        go.Scatter(
+        scatter(
             x=user_nutrition["Date"],
             y=user_nutrition["Trend Weight (kg)"],
             mode="lines+markers",
@@ -372,4 +499,29 @@ def plot_weight_per_day(
 
     fig.update_xaxes(rangeslider_visible=True)
 
+    return fig
+
+
+def plot_weight_per_day(
+    nutrition_data: pd.DataFrame,
+    user_id: str,
+    time_resolution: str = "Daily",
+    date_range: tuple | None = None,
+    max_points: int | None = None,
+) -> None:
+    """Display build_weight_per_day_figure, reusing the cached figure for the same inputs."""
+    fig = cached_figure(
+        "weight_per_day",
+        user_id,
+        {
+            "time_resolution": time_resolution,
+            "date_range": date_range,
+            "max_points": max_points,
+        },
+        nutrition_data,
+        lambda: build_weight_per_day_figure(
+            nutrition_data, user_id, time_resolution, date_range, max_points
+        ),
+    )
+
     return st.plotly_chart(fig, use_container_width=True)
@@ -0,0 +1,219 @@
+import threading
+from collections import deque
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# Columns the rolling averages are kept for. Zero and missing values are skipped,
+# as uploads store days without a value as 0.
+ROLLING_COLUMNS = [
+    "Weight (kg)",
+    "Calories (kcal)",
+    "Target Calories (kcal)",
+    "Expenditure",
+    "Steps",
+]
+
+ROLLING_WINDOWS_DAYS = [7, 28]
+
+# Share of the distance to each new weigh-in the trend weight moves, per day.
+TREND_ALPHA = 0.1
+
+
+class RollingNutritionStats:
+    """
+    Rolling nutrition metrics of one user, updated in O(new rows) as days are added.
+
+    For every window in ROLLING_WINDOWS_DAYS the rows of the last days are kept with
+    running sums and counts per column, so averages are read without scanning the
+    history. The trend weight is an exponential moving average of the weigh-ins that
+    accounts for days without one, and the weekly rate is the change of the trend
+    over the last 7 days.
+    """
+
+    def __init__(self):
+        self.last_day = None
+        self.days_added = 0
+        self.windows = {days: deque() for days in ROLLING_WINDOWS_DAYS}
+        self.sums = {days: np.zeros(len(ROLLING_COLUMNS)) for days in self.windows}
+        self.counts = {days: np.zeros(len(ROLLING_COLUMNS)) for days in self.windows}
+        self.trend_weight = np.nan
+        self.trend_day = None
+        self.trend_history = deque()
+
+    @classmethod
+    def from_history(cls, rows: pd.DataFrame) -> "RollingNutritionStats":
+        """Stats of a user's whole history, rows in any order."""
+        stats = cls()
+        stats.append(rows)
+        return stats
+
+    def append(self, rows: pd.DataFrame):
+        """
+        Add rows dated after every row already added.
+
+        Rows sharing a day are reduced to the last of them, as an upsert would.
+
+        Raises:
+            ValueError: If a row is dated on or before the last day already added.
+        """
+        if rows.empty:
+            return
+
+        days = (
+            pd.to_datetime(rows["Date"]).to_numpy().astype("datetime64[D]").astype(int)
+        )
+        values = np.column_stack(
+            [
+                (
+                    pd.to_numeric(rows[column], errors="coerce").to_numpy(dtype=float)
+                    if column in rows
+                    else np.full(len(rows), np.nan)
+                )
+                for column in ROLLING_COLUMNS
+            ]
+        )
+        order = np.argsort(days, kind="stable")
+        days, values = days[order], values[order]
+        last_of_day = np.append(days[1:] != days[:-1], True)
+        days, values = days[last_of_day], values[last_of_day]
+
+        if self.last_day is not None and days[0] <= self.last_day:
+            raise ValueError("Rows must be dated after the last day already added")
+
+        for day, row in zip(days, values):
+            self._add_day(int(day), row)
+
+    def _add_day(self, day: int, row: np.ndarray):
+        valid = row > 0
+        row = np.where(valid, row, 0.0)
+        for days, window in self.windows.items():
+            window.append((day, row, valid))
+            self.sums[days] += row
+            self.counts[days] += valid
+            while window[0][0] <= day - days:
+                _, old_row, old_valid = window.popleft()
+                self.sums[days] -= old_row
+                self.counts[days] -= old_valid
+        self.last_day = day
+        self.days_added += 1
+
+        weight = row[ROLLING_COLUMNS.index("Weight (kg)")]
+        if weight > 0:
+            if self.trend_day is None:
+                self.trend_weight = weight
+            else:
+                alpha = 1 - (1 - TREND_ALPHA) ** (day - self.trend_day)
+                self.trend_weight += alpha * (weight - self.trend_weight)
+            self.trend_day = day
+
+            # Keep the last trend dated a week or more ago, as the base of the rate.
+            self.trend_history.append((day, self.trend_weight))
+            while len(self.trend_history) > 1 and self.trend_history[1][0] <= day - 7:
+                self.trend_history.popleft()
+
+    def average(self, column: str, days: int) -> float:
+        """Mean of the non-zero values of a column over the last `days` days, or NaN."""
+        index = ROLLING_COLUMNS.index(column)
+        count = self.counts[days][index]
+        return self.sums[days][index] / count if count else np.nan
+
+    def weekly_rate(self) -> float:
+        """Change of the trend weight per week over about the last 7 days, or NaN."""
+        if len(self.trend_history) < 2:
+            return np.nan
+        (first_day, first_trend), (last_day, last_trend) = (
+            self.trend_history[0],
+            self.trend_history[-1],
+        )
+        return (last_trend - first_trend) / (last_day - first_day) * 7
+
+    def snapshot(self) -> dict:
+        """Every metric: averages keyed by (column, days), trend weight and rate."""
+        return {
+            "last_date": (
+                pd.NaT
+                if self.last_day is None
+                else pd.Timestamp(np.datetime64(self.last_day, "D"))
+            ),
+            "averages": {
+                (column, days): self.average(column, days)
+                for days in self.windows
+                for column in ROLLING_COLUMNS
+            },
+            "trend_weight": self.trend_weight,
+            "weekly_rate": self.weekly_rate(),
+        }
+
+
+class RollingStatsRegistry:
+    """
+    Process-wide RollingNutritionStats per user, tagged with the data version they
+    were built from.
+
+    Stats are rebuilt from the user's history whenever they are read with another
+    data version, whatever changed the data. update() appends uploaded days in place
+    and leaves the stats waiting for the version of the refreshed data: the next
+    version read is adopted without a rebuild if its rows end on the last day added
+    and hold as many days as the stats. An upload that changes days already added
+    drops the user's stats instead.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.users = {}
+
+    def get(self, user_id: str, version: str, load_rows) -> RollingNutritionStats:
+        """
+        The stats of a user for a data version.
+
+        Args:
+            user_id (str): The user.
+            version (str): Version of the data the caller reads.
+            load_rows (callable): Takes no arguments and returns the user's whole
+                history; only called when the stats must be checked or rebuilt.
+
+        Returns:
+            RollingNutritionStats: Stats matching the data version.
+        """
+        user_id = str(user_id)
+        with self.lock:
+            entry = self.users.get(user_id)
+            if entry is not None and entry["version"] == version:
+                return entry["stats"]
+
+            rows = load_rows()
+            if entry is not None and entry["version"] is None:
+                stats = entry["stats"]
+                days = pd.to_datetime(rows["Date"]).dt.normalize()
+                if (
+                    len(days)
+                    and days.nunique() == stats.days_added
+                    and days.max() == pd.Timestamp(np.datetime64(stats.last_day, "D"))
+                ):
+                    entry["version"] = version
+                    return stats
+
+            stats = RollingNutritionStats.from_history(rows)
+            self.users[user_id] = {"version": version, "stats": stats}
+            return stats
+
+    def update(self, user_id: str, rows: pd.DataFrame):
+        """Add a user's uploaded rows to their stats, if they have any yet."""
+        user_id = str(user_id)
+        with self.lock:
+            entry = self.users.get(user_id)
+            if entry is None:
+                return
+            try:
+                entry["stats"].append(rows)
+            except ValueError:
+                del self.users[user_id]
+            else:
+                entry["version"] = None
+
+
+@st.cache_resource
+def get_rolling_stats():
+    return RollingStatsRegistry()
@@ -0,0 +1,97 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+
+class RPEChart:
+    """
+    The RPE chart as a dense grid of percentages, one row per RPE and column per rep.
+
+    Lookups are vectorized. RPEs between two rows of the chart are interpolated
+    linearly; RPEs outside the chart, non-integer reps and reps the chart does not
+    cover give NaN.
+    """
+
+    def __init__(self, rpe_values: np.ndarray, grid: np.ndarray):
+        self.rpe_values = rpe_values
+        self.grid = grid
+
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(np.ascontiguousarray(rpe_values, dtype=float).tobytes())
+        digest.update(repr(grid.shape).encode())
+        digest.update(np.ascontiguousarray(grid, dtype=float).tobytes())
+        self.fingerprint = digest.hexdigest()
+
+    @classmethod
+    def from_table(cls, rpe_table: pd.DataFrame) -> "RPEChart":
+        """Build the grid from the rpe_chart table (rpe, reps, percentage columns)."""
+        rpe = rpe_table["rpe"].astype(float).to_numpy()
+        reps = rpe_table["reps"].astype(int).to_numpy()
+        rpe_values = np.unique(rpe)
+
+        grid = np.full((len(rpe_values), reps.max(initial=0) + 1), np.nan)
+        grid[np.searchsorted(rpe_values, rpe), reps] = rpe_table["percentage"].astype(
+            float
+        )
+        return cls(rpe_values, grid)
+
+    def percentage(self, rpe, reps) -> np.ndarray:
+        """
+        Percentage of the 1RM lifted for every (rpe, reps) pair.
+
+        Args:
+            rpe (array-like): RPE of each set, fractional values included.
+            reps (array-like): Reps of each set.
+
+        Returns:
+            np.ndarray: The percentages, NaN where the chart has no answer.
+        """
+        rpe = pd.to_numeric(pd.Series(rpe), errors="coerce").to_numpy(dtype=float)
+        reps = pd.to_numeric(pd.Series(reps), errors="coerce").to_numpy(dtype=float)
+        result = np.full(rpe.shape, np.nan)
+        if not len(self.rpe_values):
+            return result
+
+        valid = (
+            (rpe >= self.rpe_values[0])
+            & (rpe <= self.rpe_values[-1])
+            & (reps >= 0)
+            & (reps < self.grid.shape[1])
+            & (reps == np.floor(reps))
+        )
+        rpe, columns = rpe[valid], reps[valid].astype(int)
+
+        position = np.interp(rpe, self.rpe_values, np.arange(len(self.rpe_values)))
+        lower = np.floor(position).astype(int)
+        upper = np.minimum(lower + 1, len(self.rpe_values) - 1)
+        weight = position - lower
+
+        at_lower = self.grid[lower, columns]
+        result[valid] = np.where(
+            weight == 0,
+            at_lower,
+            (1 - weight) * at_lower + weight * self.grid[upper, columns],
+        )
+        return result
+
+
+@st.cache_resource
+def get_rpe_chart(_supabase) -> RPEChart:
+    """The RPE chart, read from the database once per process."""
+    return RPEChart.from_table(
+        pd.DataFrame(_supabase.client.table("rpe_chart").select("*").execute().data)
+    )
+
+
+def default_rpe_chart() -> RPEChart:
+    """The process-wide chart, read with the session's Supabase client."""
+    return get_rpe_chart(st.session_state["supabase_client"])
+
+
+def rpe_percentage(rpe, reps, chart: RPEChart | None = None) -> np.ndarray:
+    """Look up percentages in the given chart, or in the process-wide one."""
+    if chart is None:
+        chart = default_rpe_chart()
+    return chart.percentage(rpe, reps)
@@ -0,0 +1,95 @@
+import json
+import os
+import threading
+from pathlib import Path
+
+
+class SyncState:
+    """
+    Fingerprints recorded at the last successful sync, persisted as a JSON file.
+
+    For each spreadsheet the store keeps the Drive modified time seen at the start of
+    the last complete run and, per worksheet, the fingerprint of its raw values and of
+    the session rows written to the database for it.
+
+    Every fingerprint describes what the sync read or wrote, not what the database
+    holds now: the "db" entry is the hash of the cleaned rows at the time they were
+    written. Edits or deletes made directly in the database are not detected, and an
+    unchanged spreadsheet is skipped without reading the database at all. Detecting
+    database-side drift is out of scope; run the sync with --full to rewrite every
+    worksheet over such changes.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.lock = threading.Lock()
+        if self.path.exists():
+            self.data = json.loads(self.path.read_text())
+        else:
+            self.data = {"spreadsheets": {}}
+
+    def _spreadsheet(self, spreadsheet_name: str) -> dict:
+        return self.data["spreadsheets"].setdefault(
+            spreadsheet_name, {"modified_time": None, "worksheets": {}}
+        )
+
+    def spreadsheet_changed(self, spreadsheet_name: str, modified_time: str) -> bool:
+        """Whether the spreadsheet was modified since the last complete sync."""
+        return self._spreadsheet(spreadsheet_name)["modified_time"] != modified_time
+
+    def record_spreadsheet(self, spreadsheet_name: str, modified_time: str):
+        """Record the modified time a complete sync of the spreadsheet started from."""
+        self._spreadsheet(spreadsheet_name)["modified_time"] = modified_time
+
+    def worksheet_changed(
+        self, spreadsheet_name: str, worksheet_name: str, sheet_fingerprint: str
+    ) -> bool:
+        """Whether the worksheet values differ from the ones last synced."""
+        worksheet = self._spreadsheet(spreadsheet_name)["worksheets"].get(
+            worksheet_name, {}
+        )
+        return worksheet.get("sheet") != sheet_fingerprint
+
+    def rows_changed(
+        self, spreadsheet_name: str, worksheet_name: str, rows_fingerprint: str
+    ) -> bool:
+        """Whether the cleaned rows differ from the ones last written; no database read."""
+        worksheet = self._spreadsheet(spreadsheet_name)["worksheets"].get(
+            worksheet_name, {}
+        )
+        return worksheet.get("db") != rows_fingerprint
+
+    def record_worksheet(
+        self,
+        spreadsheet_name: str,
+        worksheet_name: str,
+        sheet_fingerprint: str,
+        rows_fingerprint: str,
+    ):
+        """Record the fingerprints of a worksheet whose rows are now in the database."""
+        with self.lock:
+            self._spreadsheet(spreadsheet_name)["worksheets"][worksheet_name] = {
+                "sheet": sheet_fingerprint,
+                "db": rows_fingerprint,
+            }
+
+    def export_spreadsheet(self, spreadsheet_name: str) -> dict:
+        """Return a copy of everything recorded for one spreadsheet."""
+        with self.lock:
+            return json.loads(json.dumps(self._spreadsheet(spreadsheet_name)))
+
+    def import_spreadsheet(self, spreadsheet_name: str, spreadsheet_state: dict):
+        """Replace what is recorded for one spreadsheet, e.g. with a worker's export."""
+        with self.lock:
+            self.data["spreadsheets"][spreadsheet_name] = spreadsheet_state
+
+    def clear(self):
+        """Forget every recorded fingerprint so the next sync processes everything."""
+        self.data = {"spreadsheets": {}}
+
+    def save(self):
+        """Write the state to disk, replacing the previous file atomically."""
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with self.lock:
+            tmp_path.write_text(json.dumps(self.data, indent=2, sort_keys=True))
+        os.replace(tmp_path, self.path)
@@ -1,52 +1,170 @@
-from uuid import uuid4
+from uuid import UUID, uuid4, uuid5
+from src.pl_tracker.cleaning import clean_worksheet
 from src.pl_tracker.database import SupabaseClient
+from src.pl_tracker.diff import diff_sessions
+from src.pl_tracker.fingerprint import fingerprint_frame
 from src.pl_tracker.gspread import GSpreadClient
+from src.pl_tracker.journal import SyncJournal
+from src.pl_tracker.models import AthleteReport, SyncResult
+from src.pl_tracker.rate_limit import TokenBucket
+from src.pl_tracker.sync_state import SyncState
 import streamlit as st
 import pandas as pd
-import gspread
+import argparse
+import threading
+import time
+import json
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from functools import partial
 from dotenv import load_dotenv
 import os
 
 load_dotenv()
 
-gspread_client = GSpreadClient()
-
-supabase_client = SupabaseClient(
-    os.environ["SUPABASE_URL"], os.environ["SUPABASE_API_KEY"]
-).client
-
-
-def get_available_programs(user_id):
-    """Retrieve the list of available programs from the Google Spreadsheet."""
-
-    programs_table = supabase_client.table("programs").select("*").execute().data
-
-    available_programs = {
-        entry["name"]: entry["id"]
-        for entry in programs_table
-        if entry["user_id"] == user_id
-    }
-
-    return available_programs
-
-
-def get_spreadsheet_data(spreadsheet_name, worksheet_name):
-    """Retrieve data from a specific worksheet in a Google Spreadsheet."""
-    return gspread_client.get_df_from_worksheet(
-        spreadsheet_name=spreadsheet_name, worksheet_name=worksheet_name
-    )
-
-
-def get_spreadsheet_worksheets(spreadsheet_name):
-    """Retrieve the list of worksheets in a Google Spreadsheet."""
-    spreadsheet = gspread_client.get_spreadsheet(spreadsheet_name)
-    return [worksheet.title for worksheet in spreadsheet.worksheets()]
-
+DEFAULT_USER_ID = "6dd48309-160b-4f8f-9354-270aa3808d76"
+
+CHECKPOINT_BATCH_SIZE = 500
+
+worker_clients = {}
+
+
+class SyncContext:
+    """
+    Clients, target athlete and memoized lookups shared by the phases of one sync run.
+
+    The athlete's programs and the spreadsheet's worksheet titles are fetched once,
+    on first use, and reused by both phases. Time spent in each stage of the sync
+    (fetch, clean, diff, write) is summed across threads in `timings`.
+    """
+
+    def __init__(
+        self,
+        user_id,
+        spreadsheet_name,
+        gspread_client,
+        supabase,
+        state,
+        journal,
+        workers=1,
+    ):
+        self.user_id = user_id
+        self.spreadsheet_name = spreadsheet_name
+        self.gspread_client = gspread_client
+        self.supabase = supabase
+        self.state = state
+        self.journal = journal
+        self.workers = workers
+        self._programs = None
+        self._worksheets = None
+        self.lock = threading.Lock()
+        self.timings = {}
+        self.timings_lock = threading.Lock()
+
+    @contextmanager
+    def timed(self, stage):
+        """Add the time spent in the block to the stage's total."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self.timings_lock:
+                self.timings[stage] = self.timings.get(stage, 0.0) + elapsed
+
+    @property
+    def programs(self):
+        """Names of the athlete's programs mapped to their ids."""
+        with self.lock:
+            if self._programs is None:
+                self.supabase.throttle()
+                with self.timed("fetch"):
+                    programs_table = (
+                        self.supabase.client.table("programs")
+                        .select("id,name")
+                        .eq("user_id", self.user_id)
+                        .execute()
+                        .data
+                    )
+                self._programs = {
+                    entry["name"]: entry["id"] for entry in programs_table
+                }
+            return self._programs
+
+    def add_program(self, name, program_id):
+        """Record a program created during this run."""
+        with self.lock:
+            if self._programs is not None:
+                self._programs[name] = program_id
+
+    @property
+    def worksheets(self):
+        """Titles of the worksheets in the athlete's spreadsheet."""
+        with self.lock:
+            if self._worksheets is None:
+                spreadsheet = self.gspread_client.get_spreadsheet(self.spreadsheet_name)
+                self.gspread_client.throttle()
+                with self.timed("fetch"):
+                    self._worksheets = [
+                        worksheet.title for worksheet in spreadsheet.worksheets()
+                    ]
+            return self._worksheets
+
+    def mark_done(self, worksheet_name, sheet_fingerprint, rows_fingerprint):
+        """Checkpoint a worksheet whose rows are all in the database."""
+        self.journal.record(
+            "worksheet_done",
+            self.spreadsheet_name,
+            worksheet_name,
+            sheet_fingerprint=sheet_fingerprint,
+            rows_fingerprint=rows_fingerprint,
+        )
+        self.state.record_worksheet(
+            self.spreadsheet_name, worksheet_name, sheet_fingerprint, rows_fingerprint
+        )
 
-def sync_existing_programs():
-    """Sync existing programs from the Google Spreadsheet to the Supabase database."""
-    available_programs = get_available_programs("6dd48309-160b-4f8f-9354-270aa3808d76")
+    def get_spreadsheet_data_batch(self, worksheet_names):
+        """Retrieve data from many worksheets of the spreadsheet in batched requests."""
+        with self.timed("fetch"):
+            return self.gspread_client.get_dfs_from_worksheets(
+                spreadsheet_name=self.spreadsheet_name, worksheet_names=worksheet_names
+            )
 
+    def get_spreadsheet_modified_time(self):
+        """Retrieve the Drive modified time of the spreadsheet."""
+        spreadsheet = self.gspread_client.get_spreadsheet(self.spreadsheet_name)
+        self.gspread_client.throttle()
+        with self.timed("fetch"):
+            return spreadsheet.get_lastUpdateTime()
+
+
+def run_in_pool(jobs, workers):
+    """
+    Run sync jobs on a bounded thread pool, isolating failures per program.
+
+    Args:
+        jobs (dict): Program name mapped to a callable returning its SyncResult.
+        workers (int): Maximum number of jobs running at the same time.
+
+    Returns:
+        list[SyncResult]: One result per job, failed jobs included.
+    """
+    results = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(job): program for program, job in jobs.items()}
+        for future in as_completed(futures):
+            program = futures[future]
+            try:
+                results.append(future.result())
+            except Exception as e:
+                print(f"Syncing {program} failed: {e}")
+                results.append(SyncResult(program=program, ok=False, error=str(e)))
+
+    return results
+
+
+def sync_existing_program(context, program, program_id, worksheet):
+    """Sync the sessions of one existing program with its worksheet."""
     composite_keys = [
         "Week",
         "Day",
@@ -58,170 +176,560 @@ def sync_existing_programs():
         "program_id",
     ]
 
-    for program, program_id in available_programs.items():
-        print(f"Syncing program: {program} with ID: {program_id}")
+    print(f"Syncing program: {program} with ID: {program_id}")
+    state = context.state
+    spreadsheet_name = context.spreadsheet_name
+    supabase = context.supabase
+
+    pending = context.journal.pending_program(spreadsheet_name, program)
+    if pending is not None and pending["program_id"] == program_id:
+        print(f"Resuming the interrupted first sync of {program}.")
+        return sync_new_program(context, program, worksheet)
+
+    sheet_fingerprint = fingerprint_frame(worksheet)
+
+    if not state.worksheet_changed(spreadsheet_name, program, sheet_fingerprint):
+        print(f"Worksheet {program} unchanged since last sync, skipping.")
+        return SyncResult(program=program, skipped=True)
+
+    if worksheet.empty:
+        return SyncResult(program=program, skipped=True)
+
+    with context.timed("clean"):
+        cleaned_data = clean_worksheet(worksheet, program_id)
+        rows_fingerprint = fingerprint_frame(cleaned_data)
+
+    if not state.rows_changed(spreadsheet_name, program, rows_fingerprint):
+        print(f"Sessions of {program} unchanged since last sync, skipping.")
+        context.mark_done(program, sheet_fingerprint, rows_fingerprint)
+        return SyncResult(program=program, skipped=True)
+
+    supabase.throttle()
+    with context.timed("fetch"):
         db_content = pd.DataFrame(
-            supabase_client.table("sessions")
+            supabase.client.table("sessions")
             .select("*")
             .eq("program_id", program_id)
+            .order("id")
             .execute()
             .data
         )
-        worksheet = get_spreadsheet_data("PL Programs", program)
 
-        if not worksheet.empty:
-            cleaned_data = clean_worksheet(worksheet, program_id)
+    if cleaned_data.empty and not db_content.empty:
+        print(f"Worksheet {program} has no session rows, not deleting its sessions.")
+        return SyncResult(program=program, skipped=True)
 
-            df_merged = cleaned_data.merge(
-                db_content, on=composite_keys, suffixes=("_new", "_db")
-            )
+    value_columns = [col for col in cleaned_data.columns if col not in composite_keys]
+    with context.timed("diff"):
+        changes = diff_sessions(cleaned_data, db_content, composite_keys, value_columns)
 
-            value_columns = [
-                col for col in cleaned_data.columns if col not in composite_keys
-            ]
+    if changes.empty:
+        print(f"No changes found for {program}, skipping.")
+        context.mark_done(program, sheet_fingerprint, rows_fingerprint)
+        return SyncResult(program=program)
 
-            changed_mask = False
-            for col in value_columns:
-                changed_mask |= df_merged[f"{col}_new"] != df_merged[f"{col}_db"]
+    print(
+        f"Found {len(changes.inserts)} new, {len(changes.updates)} changed and "
+        f"{len(changes.deletes)} removed records for {program}."
+    )
 
-            changed = df_merged[changed_mask]
+    inserts = changes.inserts.copy()
+    inserts["id"] = [str(uuid4()) for _ in range(len(inserts))]
+    upsert_records = pd.concat([changes.updates, inserts], ignore_index=True)
+    upsert_records = upsert_records.astype(object).where(upsert_records.notna(), None)
 
-            if changed.empty:
-                print(f"No changes found for {program}, skipping.")
-                continue
-            else:
+    with context.timed("write"):
+        reports = supabase.bulk_upsert(
+            "sessions", upsert_records.to_dict(orient="records")
+        )
+        reports += supabase.bulk_delete("sessions", changes.deletes)
 
-                print(f"Found {len(changed)} changed records for {program}.")
+    written = sum(report.rows for report in reports if report.ok)
+    latency = sum(report.latency_s for report in reports)
+    print(
+        f"Successfully synced {written}/{len(changes)} records for {program} "
+        f"in {len(reports)} batches ({latency:.2f}s)."
+    )
+    if written != len(changes):
+        return SyncResult(
+            program=program,
+            rows=written,
+            ok=False,
+            error=f"{len(changes) - written} records could not be written",
+        )
 
-                for _, row in changed.iterrows():
-                    update_payload = {col: row[f"{col}_new"] for col in value_columns}
-                    match_filter = {key: row[key] for key in composite_keys}
+    context.mark_done(program, sheet_fingerprint, rows_fingerprint)
+    return SyncResult(program=program, rows=written)
 
-                    response = (
-                        supabase_client.table("sessions")
-                        .update(update_payload)
-                        .match(match_filter)
-                        .execute()
-                    )
 
-                print(response)
-            print(f"Successfully synced {len(changed)} records for {program}.")
+def sync_existing_programs(context):
+    """Sync existing programs from the Google Spreadsheet to the Supabase database."""
+    available_programs = context.programs
+
+    worksheets = set(context.worksheets)
+    for program in available_programs:
+        if program not in worksheets:
+            print(
+                f"Worksheet {program} not found in {context.spreadsheet_name}, "
+                "skipping."
+            )
+
+    worksheets_data = context.get_spreadsheet_data_batch(
+        [program for program in available_programs if program in worksheets]
+    )
 
+    return run_in_pool(
+        {
+            program: partial(
+                sync_existing_program,
+                context,
+                program,
+                available_programs[program],
+                worksheet,
+            )
+            for program, worksheet in worksheets_data.items()
+        },
+        context.workers,
+    )
 
-def clean_worksheet(worksheet_df, program_id):
 
-    df_clean = worksheet_df[
-        ~worksheet_df.apply(
-            lambda row: row.astype(str).str.strip().eq("").all(), axis=1
+def sync_new_program(context, worksheet_name, worksheet):
+    """
+    Write the program and sessions of a worksheet that is not in the database yet.
+
+    The programs row is written first so sessions never exist without their program.
+    Sessions are upserted in checkpointed batches with ids derived from the program id
+    and row position; a rerun after a failure reuses the journaled program id and
+    skips the batches already written.
+    """
+    print(f"Processing {worksheet_name}...")
+    supabase = context.supabase
+    journal = context.journal
+    spreadsheet_name = context.spreadsheet_name
+
+    if worksheet.empty:
+        return SyncResult(program=worksheet_name, skipped=True)
+
+    pending = journal.pending_program(spreadsheet_name, worksheet_name)
+    program_id = pending["program_id"] if pending else str(uuid4())
+    with context.timed("clean"):
+        cleaned_data = clean_worksheet(worksheet, program_id)
+        rows_fingerprint = fingerprint_frame(cleaned_data)
+        cleaned_data["id"] = [
+            str(uuid5(UUID(program_id), str(position)))
+            for position in range(len(cleaned_data))
+        ]
+
+    if pending and pending["rows_fingerprint"] == rows_fingerprint:
+        written_batches = journal.written_batches(
+            spreadsheet_name, worksheet_name, program_id
+        )
+    else:
+        written_batches = set()
+        journal.record(
+            "program_started",
+            spreadsheet_name,
+            worksheet_name,
+            program_id=program_id,
+            rows_fingerprint=rows_fingerprint,
         )
-    ]
-    df_clean.columns = df_clean.iloc[1]
-    df_clean = df_clean[2:]
 
-    def is_number(x):
-        try:
-            float(x)
-            return True
-        except:
-            return False
+    if worksheet_name not in context.programs:
+        supabase.throttle()
+        with context.timed("write"):
+            supabase.client.table("programs").upsert(
+                {
+                    "id": program_id,
+                    "name": f"{worksheet_name}",
+                    "date": pd.Timestamp.now().isoformat(),
+                    "user_id": context.user_id,
+                }
+            ).execute()
+        context.add_program(worksheet_name, program_id)
+
+    records = cleaned_data.astype(object).where(cleaned_data.notna(), None)
+    records = records.to_dict(orient="records")
+    written = 0
+
+    for batch, start in enumerate(range(0, len(records), CHECKPOINT_BATCH_SIZE)):
+        chunk = records[start : start + CHECKPOINT_BATCH_SIZE]
+        if batch in written_batches:
+            continue
+
+        with context.timed("write"):
+            reports = supabase.bulk_upsert("sessions", chunk)
+        if sum(report.rows for report in reports if report.ok) != len(chunk):
+            return SyncResult(
+                program=worksheet_name,
+                rows=written,
+                ok=False,
+                error=f"batch {batch} could not be written, rerun to resume",
+            )
 
-    mask = df_clean.apply(lambda row: row.apply(is_number).any(), axis=1)
-    df_filtered = df_clean[mask].copy()
+        journal.record(
+            "batch_written",
+            spreadsheet_name,
+            worksheet_name,
+            program_id=program_id,
+            batch=batch,
+        )
+        written += len(chunk)
 
-    df_filtered = df_filtered.replace("-", 0.0)
+    context.mark_done(worksheet_name, fingerprint_frame(worksheet), rows_fingerprint)
+    print(f"Successfully synced {worksheet_name}.")
+    return SyncResult(program=worksheet_name, rows=written)
 
-    # Step 2: Convert each column to numeric, coercing errors to NaN
-    df_filtered = convert_df_strings_to_floats(df_filtered)
 
-    header_row = df_filtered.columns.tolist()
-    df_filtered = df_filtered[
-        ~df_filtered.apply(lambda row: row.tolist() == header_row, axis=1)
-    ]
+def sync_new_spreadsheets_to_database(context):
+    """Sync data from a Google Spreadsheet to the Supabase database."""
+    available_programs = dict(context.programs)
 
-    df_filtered = df_filtered.reset_index(drop=True)
+    worksheets = context.worksheets
 
-    df_filtered = df_filtered.rename(
-        columns={
-            "% Min": "perc_min",
-            "% Max": "perc_max",
-            "Carico Min (kg)": "carico_min",
-            "Carico Max (kg)": "carico_max",
-            "Min. Reps": "min_reps",
-            "Max. Reps": "max_reps",
-        }
+    for worksheet_name in worksheets:
+        if f"{worksheet_name}" in available_programs:
+            print(f"Program {worksheet_name} already exists in the database, skipping.")
+
+    worksheets_data = context.get_spreadsheet_data_batch(
+        [name for name in worksheets if f"{name}" not in available_programs]
     )
 
-    df_filtered["Exercise"] = df_filtered["Exercise"].str.title()
-    df_filtered["program_id"] = program_id
-    df_filtered["Test"] = df_filtered["Test"].astype(bool)
-    return df_filtered
+    return run_in_pool(
+        {
+            worksheet_name: partial(
+                sync_new_program, context, worksheet_name, worksheet
+            )
+            for worksheet_name, worksheet in worksheets_data.items()
+        },
+        context.workers,
+    )
 
 
-def try_convert_to_float(val):
-    if isinstance(val, str):
-        val = val.replace(",", ".")
-    try:
-        return float(val)
-    except (ValueError, TypeError):
-        return val
+def sync_athlete(context):
+    """Run both sync phases for one athlete's spreadsheet, unless it is unchanged."""
+    modified_time = context.get_spreadsheet_modified_time()
 
+    if not context.state.spreadsheet_changed(context.spreadsheet_name, modified_time):
+        print(
+            f"{context.spreadsheet_name} unchanged since last sync ({modified_time})."
+        )
+        return []
 
-def convert_df_strings_to_floats(df):
-    return df.applymap(try_convert_to_float)
+    print("Syncing existing programs from Google Spreadsheet to Supabase...")
 
+    results = sync_existing_programs(context)
 
-def sync_new_spreadsheets_to_database(spreadsheet_name="PL Programs"):
-    """Sync data from a Google Spreadsheet to the Supabase database."""
-    available_programs = get_available_programs("6dd48309-160b-4f8f-9354-270aa3808d76")
+    print("Sync existing programs completed.")
 
-    worksheets = get_spreadsheet_worksheets(spreadsheet_name)
+    print("Syncing new programs from Google Spreadsheet to Supabase...")
 
-    for worksheet_name in worksheets:
-        try:
-            print(f"Processing {worksheet_name}...")
-            if f"{worksheet_name}" in available_programs:
-                print(
-                    f"Program {worksheet_name} already exists in the database, skipping."
+    results += sync_new_spreadsheets_to_database(context)
+
+    print("Sync new programs completed.")
+
+    if all(result.ok for result in results):
+        context.state.record_spreadsheet(context.spreadsheet_name, modified_time)
+
+    return results
+
+
+def run_athlete(
+    user_id, spreadsheet_name, gspread_client, supabase, state, journal, workers
+):
+    """
+    Sync one athlete and report how long it took and what was written.
+
+    The sync runs in its own process and cannot reach the app's DataCache, so the
+    rows it writes show up in the app once the cached sessions expire (DataCache
+    ttl_s, 15 minutes by default).
+    """
+    print(f"Syncing athlete {user_id} from {spreadsheet_name}...")
+    start = time.perf_counter()
+    context = SyncContext(
+        user_id,
+        spreadsheet_name,
+        gspread_client,
+        supabase,
+        state,
+        journal,
+        workers=workers,
+    )
+
+    try:
+        results = sync_athlete(context)
+    except Exception as e:
+        print(f"Syncing athlete {user_id} failed: {e}")
+        return AthleteReport(
+            user_id=user_id,
+            spreadsheet=spreadsheet_name,
+            elapsed_s=time.perf_counter() - start,
+            timings=context.timings,
+            error=str(e),
+        )
+
+    return AthleteReport(
+        user_id=user_id,
+        spreadsheet=spreadsheet_name,
+        elapsed_s=time.perf_counter() - start,
+        timings=context.timings,
+        results=results,
+    )
+
+
+def init_worker(sheets_rps, supabase_rps):
+    """Build the clients of a sync worker process."""
+    worker_clients["gspread"] = GSpreadClient(rate_limiter=TokenBucket(sheets_rps))
+    worker_clients["supabase"] = SupabaseClient(
+        os.environ["SUPABASE_URL"],
+        os.environ["SUPABASE_API_KEY"],
+        rate_limiter=TokenBucket(supabase_rps),
+    )
+
+
+def run_athlete_in_worker(
+    user_id, spreadsheet_name, state_path, journal_path, full, workers
+):
+    """
+    Sync one athlete inside a worker process.
+
+    The worker reads its own copy of the sync state, brought up to date with the
+    journal, and returns what it recorded for the athlete's spreadsheet, which the
+    parent merges and saves. Journal entries are appended to the shared file.
+    """
+    state = SyncState(state_path)
+    journal = SyncJournal(journal_path)
+    if full:
+        state.clear()
+    else:
+        journal.replay(state)
+
+    report = run_athlete(
+        user_id,
+        spreadsheet_name,
+        worker_clients["gspread"],
+        worker_clients["supabase"],
+        state,
+        journal,
+        workers,
+    )
+    return report, state.export_spreadsheet(spreadsheet_name)
+
+
+def sync_athletes(athletes, state, journal, args):
+    """
+    Sync every athlete, sharding them across a process pool when --processes > 1.
+
+    Args:
+        athletes (list): (user_id, spreadsheet name) pairs.
+        state (SyncState): Sync state the results of every athlete are recorded in.
+        journal (SyncJournal): Checkpoint journal of the run.
+        args (argparse.Namespace): Parsed command line options.
+
+    Returns:
+        list[AthleteReport]: One report per athlete.
+    """
+    processes = min(args.processes, len(athletes))
+
+    if processes <= 1:
+        gspread_client = GSpreadClient(rate_limiter=TokenBucket(args.sheets_rps))
+        supabase = SupabaseClient(
+            os.environ["SUPABASE_URL"],
+            os.environ["SUPABASE_API_KEY"],
+            rate_limiter=TokenBucket(args.supabase_rps),
+        )
+        return [
+            run_athlete(
+                user_id,
+                spreadsheet_name,
+                gspread_client,
+                supabase,
+                state,
+                journal,
+                args.workers,
+            )
+            for user_id, spreadsheet_name in athletes
+        ]
+
+    reports = []
+    with ProcessPoolExecutor(
+        max_workers=processes,
+        initializer=init_worker,
+        initargs=(args.sheets_rps / processes, args.supabase_rps / processes),
+    ) as executor:
+        futures = {
+            executor.submit(
+                run_athlete_in_worker,
+                user_id,
+                spreadsheet_name,
+                args.state_file,
+                args.journal_file,
+                args.full,
+                args.workers,
+            ): (user_id, spreadsheet_name)
+            for user_id, spreadsheet_name in athletes
+        }
+        for future in as_completed(futures):
+            user_id, spreadsheet_name = futures[future]
+            try:
+                report, spreadsheet_state = future.result()
+            except Exception as e:
+                print(f"Worker syncing athlete {user_id} failed: {e}")
+                reports.append(
+                    AthleteReport(
+                        user_id=user_id,
+                        spreadsheet=spreadsheet_name,
+                        elapsed_s=0.0,
+                        error=str(e),
+                    )
                 )
                 continue
 
-            program_id = str(uuid4())
-            worksheet = get_spreadsheet_data(spreadsheet_name, f"{worksheet_name}")
-            if not worksheet.empty:
-                cleaned_data = clean_worksheet(worksheet, program_id)
-                cleaned_data["id"] = [str(uuid4()) for _ in range(len(cleaned_data))]
+            state.import_spreadsheet(spreadsheet_name, spreadsheet_state)
+            reports.append(report)
+
+    return reports
 
-                supabase_client.table("sessions").insert(
-                    cleaned_data.to_dict(orient="records")
-                ).execute()
 
-                supabase_client.table("programs").insert(
-                    {
-                        "id": program_id,
-                        "name": f"{worksheet_name}",
-                        "date": pd.Timestamp.now().isoformat(),
-                        "user_id": "6dd48309-160b-4f8f-9354-270aa3808d76",
-                    }
-                ).execute()
-                print(f"Successfully synced {worksheet_name}.")
+def positive_float(value):
+    """argparse type for a float greater than zero."""
+    number = float(value)
+    if not number > 0:
+        raise argparse.ArgumentTypeError(f"must be greater than 0, got {value}")
+    return number
 
-        except gspread.exceptions.WorksheetNotFound as e:
-            print(f"Worksheet {worksheet_name} not found, stopping.")
-            break
+
+def load_athletes(path):
+    """Read an athlete to spreadsheet mapping from a JSON object file."""
+    with open(path) as f:
+        return list(json.load(f).items())
+
+
+def print_summary(results, elapsed):
+    """Print throughput and failures of a sync run."""
+    processed = [result for result in results if not result.skipped]
+    failed = [result for result in results if not result.ok]
+    rows = sum(result.rows for result in results)
+
+    print(
+        f"Synced {len(processed)} programs ({len(results) - len(processed)} skipped, "
+        f"{len(failed)} failed) and {rows} rows in {elapsed:.2f}s: "
+        f"{len(processed) / elapsed:.2f} programs/s, {rows / elapsed:.1f} rows/s."
+    )
+    for result in failed:
+        print(f"  {result.program}: {result.error}")
+
+
+def print_report(reports, elapsed):
+    """Print per-athlete timings and row counts, then the run summary."""
+    for report in sorted(reports, key=lambda report: report.user_id):
+        rows = sum(result.rows for result in report.results)
+        status = f"failed: {report.error}" if report.error else "ok"
+        print(
+            f"{report.user_id} ({report.spreadsheet}): "
+            f"{len(report.results)} programs, {rows} rows "
+            f"in {report.elapsed_s:.2f}s, {status}"
+        )
+        if report.timings:
+            print(
+                "  "
+                + ", ".join(
+                    f"{stage} {seconds:.2f}s"
+                    for stage, seconds in report.timings.items()
+                )
+            )
+
+    print_summary([result for report in reports for result in report.results], elapsed)
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Sync Google Spreadsheet programs to Supabase."
+    )
+    parser.add_argument(
+        "--athlete",
+        nargs=2,
+        action="append",
+        metavar=("USER_ID", "SPREADSHEET"),
+        help="Athlete to sync and the spreadsheet holding their programs. "
+        "Repeat to sync several athletes.",
+    )
+    parser.add_argument(
+        "--athletes-file",
+        help="JSON file mapping athlete user ids to spreadsheet names, e.g. "
+        '{"<user_id>": "PL Programs"}.',
+    )
+    parser.add_argument(
+        "--state-file",
+        default=".sync_state.json",
+        help="Where fingerprints of the last successful sync are stored.",
+    )
+    parser.add_argument(
+        "--journal-file",
+        default=".sync_journal.jsonl",
+        help="Checkpoint journal an interrupted sync resumes from.",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help=(
+            "Ignore the stored fingerprints and checkpoint journal and sync every "
+            "worksheet, e.g. to repair sessions edited directly in the database."
+        ),
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=1,
+        help="Number of worker processes athletes are sharded across.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="Number of programs synced concurrently by each process.",
+    )
+    parser.add_argument(
+        "--sheets-rps",
+        type=positive_float,
+        default=1.0,
+        help="Maximum Google Sheets API requests per second, across processes.",
+    )
+    parser.add_argument(
+        "--supabase-rps",
+        type=positive_float,
+        default=10.0,
+        help="Maximum Supabase requests per second, across processes.",
+    )
+    args = parser.parse_args()
 
-    print("Starting sync process...")
+    athletes = list(args.athlete or [])
+    if args.athletes_file:
+        athletes += load_athletes(args.athletes_file)
+    if not athletes:
+        athletes = [(DEFAULT_USER_ID, "PL Programs")]
 
-    print("Syncing existing programs from Google Spreadsheet to Supabase...")
+    print("Starting sync process...")
 
-    sync_existing_programs()
+    state = SyncState(args.state_file)
+    journal = SyncJournal(args.journal_file)
+    if args.full:
+        # Replaying would mark the journaled worksheets as finished again.
+        state.clear()
+        journal.clear()
+    else:
+        journal.replay(state)
 
-    print("Sync existing programs completed.")
+    start = time.perf_counter()
 
-    print("Syncing new programs from Google Spreadsheet to Supabase...")
+    try:
+        reports = sync_athletes(athletes, state, journal, args)
+    finally:
+        state.save()
 
-    sync_new_spreadsheets_to_database()
+    if all(
+        report.error is None and all(result.ok for result in report.results)
+        for report in reports
+    ):
+        journal.clear()
 
-    print("Sync new programs completed.")
+    print_report(reports, time.perf_counter() - start)
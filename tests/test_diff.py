@@ -0,0 +1,110 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.pl_tracker.diff import diff_sessions
+
+KEY_COLUMNS = ["Week", "Day", "Exercise"]
+VALUE_COLUMNS = ["Topset", "Notes"]
+
+
+def sheet_rows(*rows) -> pd.DataFrame:
+    return pd.DataFrame(rows, columns=KEY_COLUMNS + VALUE_COLUMNS)
+
+
+def db_rows(*rows) -> pd.DataFrame:
+    return pd.DataFrame(rows, columns=["id"] + KEY_COLUMNS + VALUE_COLUMNS)
+
+
+def diff(new_rows, old_rows):
+    return diff_sessions(new_rows, old_rows, KEY_COLUMNS, VALUE_COLUMNS)
+
+
+class DiffSessionsTest(unittest.TestCase):
+    def test_unchanged_rows_give_an_empty_diff(self):
+        changes = diff(
+            sheet_rows((1, 1, "Squat", 100.0, None), (1, 2, "Panca", 80.0, "ok")),
+            db_rows(("a", 1, 1, "Squat", 100, None), ("b", 1, 2, "Panca", 80, "ok")),
+        )
+
+        self.assertTrue(changes.empty)
+
+    def test_new_row_is_inserted(self):
+        changes = diff(
+            sheet_rows((1, 1, "Squat", 100.0, None), (1, 2, "Panca", 80.0, None)),
+            db_rows(("a", 1, 1, "Squat", 100.0, None)),
+        )
+
+        self.assertEqual(changes.inserts["Exercise"].tolist(), ["Panca"])
+        self.assertTrue(changes.updates.empty)
+        self.assertEqual(changes.deletes, [])
+
+    def test_changed_value_is_updated_with_the_old_id(self):
+        changes = diff(
+            sheet_rows((1, 1, "Squat", 105.0, np.nan)),
+            db_rows(("a", 1, 1, "Squat", 100.0, None)),
+        )
+
+        self.assertTrue(changes.inserts.empty)
+        self.assertEqual(changes.updates["id"].tolist(), ["a"])
+        self.assertEqual(changes.updates["Topset"].tolist(), [105.0])
+        self.assertEqual(changes.deletes, [])
+
+    def test_missing_row_is_deleted(self):
+        changes = diff(
+            sheet_rows((1, 1, "Squat", 100.0, None)),
+            db_rows(
+                ("a", 1, 1, "Squat", 100.0, None), ("b", 1, 2, "Panca", 80.0, None)
+            ),
+        )
+
+        self.assertTrue(changes.inserts.empty)
+        self.assertTrue(changes.updates.empty)
+        self.assertEqual(changes.deletes, ["b"])
+
+    def test_duplicate_keys_are_paired_whatever_the_database_order(self):
+        new_rows = sheet_rows(
+            (1, 1, "Squat", 100.0, "top"), (1, 1, "Squat", 90.0, "backoff")
+        )
+        old_rows = db_rows(
+            ("a", 1, 1, "Squat", 100.0, "top"), ("b", 1, 1, "Squat", 90.0, "backoff")
+        )
+
+        self.assertTrue(diff(new_rows, old_rows).empty)
+        self.assertTrue(diff(new_rows, old_rows.iloc[::-1]).empty)
+
+    def test_duplicate_keys_update_only_the_changed_row(self):
+        changes = diff(
+            sheet_rows((1, 1, "Squat", 100.0, "top"), (1, 1, "Squat", 92.5, "backoff")),
+            db_rows(
+                ("b", 1, 1, "Squat", 90.0, "backoff"),
+                ("a", 1, 1, "Squat", 100.0, "top"),
+            ),
+        )
+
+        self.assertTrue(changes.inserts.empty)
+        self.assertEqual(changes.updates["id"].tolist(), ["b"])
+        self.assertEqual(changes.updates["Topset"].tolist(), [92.5])
+        self.assertEqual(changes.deletes, [])
+
+    def test_extra_duplicate_is_inserted_or_deleted(self):
+        one = sheet_rows((1, 1, "Squat", 100.0, None))
+        two = sheet_rows((1, 1, "Squat", 100.0, None), (1, 1, "Squat", 100.0, None))
+
+        inserted = diff(two, db_rows(("a", 1, 1, "Squat", 100.0, None)))
+        deleted = diff(
+            one,
+            db_rows(
+                ("a", 1, 1, "Squat", 100.0, None), ("b", 1, 1, "Squat", 100.0, None)
+            ),
+        )
+
+        self.assertEqual(len(inserted.inserts), 1)
+        self.assertEqual(len(inserted), 1)
+        self.assertEqual(deleted.deletes, ["b"])
+        self.assertEqual(len(deleted), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import gc
+import unittest
+
+import pandas as pd
+
+from src.pl_tracker.memo import FrameMemo, LRUCache
+
+
+class FrameMemoTest(unittest.TestCase):
+    def test_computes_once_per_frame(self):
+        calls = []
+        memo = FrameMemo(lambda frame: calls.append(frame) or len(frame))
+        frame = pd.DataFrame({"a": [1, 2, 3]})
+
+        self.assertEqual(memo(frame), 3)
+        self.assertEqual(memo(frame), 3)
+        self.assertEqual(len(calls), 1)
+
+        self.assertEqual(memo(frame.copy()), 3)
+        self.assertEqual(len(calls), 2)
+
+    def test_forgets_collected_frames(self):
+        memo = FrameMemo(len)
+        frame = pd.DataFrame({"a": [1, 2, 3]})
+        memo(frame)
+        self.assertEqual(len(memo.entries), 1)
+
+        del frame
+        gc.collect()
+        self.assertEqual(len(memo.entries), 0)
+
+
+class LRUCacheTest(unittest.TestCase):
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.put("c", 3)
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.get("c"), 3)
+        self.assertEqual(
+            cache.stats(), {"hits": 3, "misses": 1, "evictions": 1, "entries": 2}
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.pl_tracker.rolling_stats import RollingNutritionStats, RollingStatsRegistry
+
+
+def make_history(days: int, seed: int = 0) -> pd.DataFrame:
+    """Daily nutrition rows with gaps and days without a weigh-in."""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2024-01-01", periods=days, freq="D")
+    rows = pd.DataFrame(
+        {
+            "Date": dates,
+            "Weight (kg)": rng.normal(80, 1, days).round(2),
+            "Calories (kcal)": rng.integers(1800, 3200, days),
+            "Target Calories (kcal)": rng.choice([0, 2500, 2600], days),
+            "Expenditure": rng.integers(2200, 3000, days),
+            "Steps": rng.integers(0, 15000, days),
+        }
+    )
+    rows.loc[rng.random(days) < 0.2, "Weight (kg)"] = 0
+    return rows[rng.random(days) > 0.1].reset_index(drop=True)
+
+
+class RollingNutritionStatsTest(unittest.TestCase):
+    def assert_same_stats(self, first, second):
+        first, second = first.snapshot(), second.snapshot()
+        self.assertEqual(first["last_date"], second["last_date"])
+        np.testing.assert_allclose(first["trend_weight"], second["trend_weight"])
+        np.testing.assert_allclose(first["weekly_rate"], second["weekly_rate"])
+        for key, value in first["averages"].items():
+            np.testing.assert_allclose(value, second["averages"][key], err_msg=key)
+
+    def test_appending_days_matches_a_rebuild(self):
+        history = make_history(200)
+        incremental = RollingNutritionStats.from_history(history.iloc[:150])
+        for start in range(150, len(history), 3):
+            incremental.append(history.iloc[start : start + 3])
+
+        self.assert_same_stats(incremental, RollingNutritionStats.from_history(history))
+
+    def test_averages_match_pandas_rolling(self):
+        history = make_history(120)
+        stats = RollingNutritionStats.from_history(history)
+
+        for column in ["Calories (kcal)", "Weight (kg)"]:
+            values = history.set_index("Date")[column].astype(float)
+            values = values[values > 0]
+            for days in [7, 28]:
+                expected = values[
+                    values.index > values.index[-1] - pd.Timedelta(days=days)
+                ]
+                self.assertAlmostEqual(stats.average(column, days), expected.mean())
+
+    def test_rows_on_or_before_the_last_day_are_rejected(self):
+        history = make_history(30)
+        stats = RollingNutritionStats.from_history(history)
+
+        with self.assertRaises(ValueError):
+            stats.append(history.iloc[-1:])
+
+    def test_duplicated_days_keep_the_last_row(self):
+        rows = pd.DataFrame(
+            {
+                "Date": ["2024-01-01", "2024-01-02", "2024-01-02"],
+                "Weight (kg)": [80, 81, 82],
+            }
+        )
+        stats = RollingNutritionStats.from_history(rows)
+
+        self.assertEqual(stats.days_added, 2)
+        self.assertEqual(stats.average("Weight (kg)", 7), 81)
+
+
+class RollingStatsRegistryTest(unittest.TestCase):
+    def test_new_version_rebuilds_the_stats(self):
+        registry = RollingStatsRegistry()
+        history = make_history(60)
+        first = registry.get("user", "v1", lambda: history.iloc[:40])
+
+        self.assertIs(registry.get("user", "v1", lambda: history), first)
+        rebuilt = registry.get("user", "v2", lambda: history)
+        self.assertIsNot(rebuilt, first)
+        self.assertEqual(rebuilt.days_added, len(history))
+
+    def test_upload_is_appended_and_the_refreshed_version_adopted(self):
+        registry = RollingStatsRegistry()
+        history = make_history(60)
+        stats = registry.get("user", "v1", lambda: history.iloc[:40])
+
+        registry.update("user", history.iloc[40:])
+
+        self.assertIs(registry.get("user", "v2", lambda: history), stats)
+        self.assertIs(registry.get("user", "v2", lambda: None), stats)
+
+    def test_stale_data_after_an_upload_rebuilds(self):
+        registry = RollingStatsRegistry()
+        history = make_history(60)
+        registry.get("user", "v1", lambda: history.iloc[:40])
+        registry.update("user", history.iloc[40:])
+
+        stale = registry.get("user", "v1-stale", lambda: history.iloc[:40])
+
+        self.assertEqual(stale.days_added, 40)
+
+    def test_upload_changing_old_days_drops_the_stats(self):
+        registry = RollingStatsRegistry()
+        history = make_history(60)
+        registry.get("user", "v1", lambda: history)
+
+        registry.update("user", history.iloc[10:12])
+
+        self.assertNotIn("user", registry.users)
+
+
+if __name__ == "__main__":
+    unittest.main()